@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Local HTTP analytics service over the columnar snapshot built by analytics_snapshot.py
+
+GET /query answers group-by / filter / top-N spend queries with vectorized
+NumPy kernels, e.g.
+
+    /query?group_by=state,year&naics=5415&date_from=2020-01-01&top=10
+
+Filters: state, agency, sub_tier, awardee, city (repeatable, exact match),
+naics (repeatable, prefix match), date_from, date_to (YYYY-MM-DD).
+Group-by dimensions: state, agency, sub_tier, naics, awardee, city, year, month.
+Rows with a NULL value in any grouped dimension are excluded, matching the
+API routes. GET /health reports the loaded snapshot.
+
+The snapshot is reloaded whenever the CURRENT pointer changes.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from analytics_snapshot import SNAPSHOT_ROOT, DIMENSIONS, NO_DATE
+
+DEFAULT_PORT = int(os.getenv('ANALYTICS_PORT', 8765))
+
+# Group-by key spaces up to this size are aggregated with a dense bincount;
+# larger ones (e.g. awardee x city) fall back to sorting the keys
+MAX_DENSE_GROUPS = 1 << 22
+
+class QueryError(ValueError):
+    """Raised for malformed query parameters"""
+
+class Snapshot:
+    """Memory-mapped columns of one snapshot directory"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self.codes = {}
+        self.values = {}
+        for dim in DIMENSIONS:
+            self.codes[dim] = np.load(os.path.join(path, f'{dim}.npy'), mmap_mode='r')
+            with open(os.path.join(path, f'{dim}.dict.json')) as f:
+                self.values[dim] = json.load(f)
+        self.amount = np.load(os.path.join(path, 'amount.npy'), mmap_mode='r')
+        self.posted_days = np.load(os.path.join(path, 'posted_days.npy'), mmap_mode='r')
+        self.has_date = self.posted_days != NO_DATE
+
+        # Derived calendar columns; code 0 means no date
+        months = self.posted_days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        self.year_min = int(months[self.has_date].min() // 12 + 1970) if self.has_date.any() else 1970
+        self.codes['year'] = np.where(self.has_date, months // 12 + 1970 - self.year_min + 1, 0).astype(np.int32)
+        self.codes['month'] = np.where(self.has_date, months % 12 + 1, 0).astype(np.int32)
+        year_count = int(self.codes['year'].max()) if len(self.codes['year']) else 0
+        self.values['year'] = [None] + [self.year_min + i for i in range(year_count)]
+        self.values['month'] = [None] + list(range(1, 13))
+
+        self.labels = self.manifest.get('labels', {})
+
+    @property
+    def row_count(self):
+        return len(self.amount)
+
+    def _allowed_codes(self, dim, wanted, prefix=False):
+        values = self.values[dim]
+        if prefix:
+            return [i for i, v in enumerate(values) if v is not None and any(v.startswith(w) for w in wanted)]
+        wanted = set(wanted)
+        return [i for i, v in enumerate(values) if v in wanted]
+
+    def query(self, group_by, filters, top=None, order='total'):
+        """Run a group-by spend aggregation, returning a list of row dicts and the group count"""
+        for dim in group_by:
+            if dim not in self.codes:
+                raise QueryError(f"Unknown group_by dimension: {dim}")
+        if order not in ('total', 'count'):
+            raise QueryError("order must be 'total' or 'count'")
+
+        mask = np.ones(self.row_count, dtype=bool)
+        for dim in DIMENSIONS:
+            wanted = filters.get(dim)
+            if wanted:
+                allowed = np.zeros(len(self.values[dim]), dtype=bool)
+                allowed[self._allowed_codes(dim, wanted, prefix=(dim == 'naics'))] = True
+                mask &= allowed[self.codes[dim]]
+        if filters.get('date_from'):
+            mask &= self.has_date & (self.posted_days >= _parse_days(filters['date_from']))
+        if filters.get('date_to'):
+            mask &= self.has_date & (self.posted_days <= _parse_days(filters['date_to']))
+
+        radices = [len(self.values[dim]) for dim in group_by]
+        key_space = int(np.prod(radices, dtype=float))
+        if key_space >= 2 ** 62:
+            raise QueryError("Too many group_by dimensions for one query")
+        dense = key_space <= MAX_DENSE_GROUPS
+
+        # Pack the grouped codes into one mixed-radix key per row
+        key = np.zeros(self.row_count, dtype=np.int64)
+        for dim, radix in zip(group_by, radices):
+            codes = self.codes[dim]
+            mask &= codes != 0
+            key *= radix
+            key += codes
+
+        if dense:
+            # Filtered-out rows go to one extra bin instead of being copied out
+            key[~mask] = key_space
+            totals = np.bincount(key, weights=self.amount, minlength=key_space + 1)[:key_space]
+            counts = np.bincount(key, minlength=key_space + 1)[:key_space]
+            groups = np.flatnonzero(counts)
+            totals, counts = totals[groups], counts[groups]
+        else:
+            key = key[mask]
+            groups, inverse = np.unique(key, return_inverse=True)
+            totals = np.bincount(inverse, weights=self.amount[mask], minlength=len(groups))
+            counts = np.bincount(inverse, minlength=len(groups))
+
+        ranking = totals if order == 'total' else counts
+        if top is not None and top < len(groups):
+            picked = np.argpartition(-ranking, top - 1)[:top]
+        else:
+            picked = np.arange(len(groups))
+        picked = picked[np.argsort(-ranking[picked], kind='stable')]
+
+        rows = []
+        for g in picked:
+            remainder = int(groups[g])
+            decoded = []
+            for dim, radix in reversed(list(zip(group_by, radices))):
+                remainder, code = divmod(remainder, radix)
+                decoded.append((dim, self.values[dim][code]))
+            row = dict(reversed(decoded))
+            for dim in ('state', 'naics'):
+                if dim in row:
+                    row[f'{dim}_label'] = self.labels.get(dim, {}).get(row[dim])
+            row['contract_count'] = int(counts[g])
+            row['total_amount'] = float(totals[g])
+            row['avg_amount'] = float(totals[g] / counts[g])
+            rows.append(row)
+        return rows, len(groups)
+
+def _parse_days(value):
+    try:
+        return (date.fromisoformat(value[:10]) - date(1970, 1, 1)).days
+    except ValueError:
+        raise QueryError(f"Invalid date: {value}")
+
+class SnapshotStore:
+    """Holds the live snapshot and swaps it when CURRENT changes"""
+
+    def __init__(self, root):
+        self.root = root
+        self.pointer = os.path.join(root, 'CURRENT')
+        self.current_name = None
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        try:
+            with open(self.pointer) as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return self.snapshot
+        if name != self.current_name:
+            with self.lock:
+                if name != self.current_name:
+                    snapshot = Snapshot(os.path.join(self.root, name))
+                    self.snapshot, self.current_name = snapshot, name
+                    print(f"Loaded analytics snapshot {name} ({snapshot.row_count} rows)")
+        return self.snapshot
+
+def make_handler(store):
+    class AnalyticsHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            snapshot = store.get()
+            if snapshot is None:
+                return self._send(503, {'error': 'No analytics snapshot available'})
+
+            if url.path == '/health':
+                return self._send(200, {
+                    'snapshot': snapshot.manifest['name'],
+                    'built_at': snapshot.manifest['built_at'],
+                    'row_count': snapshot.row_count,
+                })
+
+            if url.path != '/query':
+                return self._send(404, {'error': 'Not found'})
+
+            try:
+                group_by = [d for d in ','.join(params.get('group_by', [])).split(',') if d]
+                filters = {dim: params[dim] for dim in DIMENSIONS if dim in params}
+                for key in ('date_from', 'date_to'):
+                    if key in params:
+                        filters[key] = params[key][0]
+                top = int(params['top'][0]) if 'top' in params else None
+                if top is not None and top < 1:
+                    raise QueryError("top must be positive")
+                order = params.get('order', ['total'])[0]
+
+                started = time.perf_counter()
+                rows, group_count = snapshot.query(group_by, filters, top=top, order=order)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            except (QueryError, ValueError) as e:
+                return self._send(400, {'error': str(e)})
+
+            self._send(200, {
+                'rows': rows,
+                'groups': group_count,
+                'snapshot': snapshot.manifest['name'],
+                'elapsed_ms': round(elapsed_ms, 3),
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return AnalyticsHandler
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve spend analytics from the columnar snapshot')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_ROOT)
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.snapshot_dir)
+    if store.get() is None:
+        print(f"Warning: no snapshot in {args.snapshot_dir} yet; run analytics_snapshot.py")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(store))
+    print(f"Analytics service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Build a memory-mapped columnar snapshot of contract spend for the analytics service
+
+Each snapshot is a directory of NumPy arrays: dictionary codes for every
+dimension, award amounts and posted dates (days since 1970-01-01). The
+CURRENT file in the snapshot root names the live snapshot and is replaced
+atomically, so analytics_server.py never sees a half-written snapshot.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+from datetime import date, datetime
+
+import numpy as np
+
+from db_utils import get_connection
+from dataset_epoch import record_epoch
+
+SNAPSHOT_ROOT = os.getenv(
+    'ANALYTICS_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'analytics')
+)
+
+# Dimension name -> contracts column. Code 0 is reserved for NULL / empty.
+DIMENSIONS = {
+    'state': 'state',
+    'agency': 'department_agency',
+    'sub_tier': 'sub_tier',
+    'naics': 'naics_code',
+    'awardee': 'awardee',
+    'city': 'city',
+}
+
+# Sentinel for a missing posted_date
+NO_DATE = np.iinfo(np.int32).min
+
+FETCH_SIZE = 50000
+KEEP_SNAPSHOTS = 2
+
+def _days(value):
+    """Convert a date/datetime to days since the Unix epoch"""
+    if value is None:
+        return NO_DATE
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - date(1970, 1, 1)).days
+
+def _fetch_labels(conn, query):
+    with conn.cursor() as cur:
+        cur.execute(query)
+        return {code: name for code, name in cur.fetchall()}
+
+def build_snapshot(conn, snapshot_root=SNAPSHOT_ROOT):
+    """Write a new snapshot from the contracts table, make it current and bump the dataset epoch"""
+    os.makedirs(snapshot_root, exist_ok=True)
+    name = 'snapshot-' + datetime.now().strftime('%Y%m%d%H%M%S%f')
+    tmp_dir = os.path.join(snapshot_root, name + '.tmp')
+    os.makedirs(tmp_dir)
+
+    lookups = {dim: {None: 0} for dim in DIMENSIONS}
+    code_chunks = {dim: [] for dim in DIMENSIONS}
+    amount_chunks = []
+    date_chunks = []
+    columns = ', '.join(DIMENSIONS.values())
+
+    try:
+        # Named cursor streams rows from the server instead of loading them all
+        with conn.cursor(name='analytics_snapshot') as cur:
+            cur.itersize = FETCH_SIZE
+            cur.execute(f"""
+                SELECT {columns}, award_amount, posted_date
+                FROM contracts
+                WHERE award_amount IS NOT NULL AND award_amount > 0
+            """)
+            while True:
+                rows = cur.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for i, dim in enumerate(DIMENSIONS):
+                    lookup = lookups[dim]
+                    code_chunks[dim].append(np.fromiter(
+                        (lookup.setdefault(row[i] or None, len(lookup)) for row in rows),
+                        dtype=np.int32, count=len(rows)
+                    ))
+                n = len(DIMENSIONS)
+                amount_chunks.append(np.fromiter((float(row[n]) for row in rows), dtype=np.float64, count=len(rows)))
+                date_chunks.append(np.fromiter((_days(row[n + 1]) for row in rows), dtype=np.int32, count=len(rows)))
+        conn.commit()
+
+        row_count = 0
+        for dim in DIMENSIONS:
+            codes = np.concatenate(code_chunks[dim]) if code_chunks[dim] else np.zeros(0, dtype=np.int32)
+            np.save(os.path.join(tmp_dir, f'{dim}.npy'), codes)
+            row_count = len(codes)
+            values = sorted(lookups[dim], key=lookups[dim].get)
+            with open(os.path.join(tmp_dir, f'{dim}.dict.json'), 'w') as f:
+                json.dump(values, f)
+        np.save(os.path.join(tmp_dir, 'amount.npy'),
+                np.concatenate(amount_chunks) if amount_chunks else np.zeros(0, dtype=np.float64))
+        np.save(os.path.join(tmp_dir, 'posted_days.npy'),
+                np.concatenate(date_chunks) if date_chunks else np.zeros(0, dtype=np.int32))
+
+        labels = {
+            'state': _fetch_labels(conn, "SELECT code, name FROM states"),
+            'naics': _fetch_labels(conn, "SELECT code, title FROM naics_codes"),
+        }
+        manifest = {
+            'name': name,
+            'built_at': datetime.now().isoformat(),
+            'row_count': row_count,
+            'dimensions': list(DIMENSIONS),
+            'labels': labels,
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+
+        final_dir = os.path.join(snapshot_root, name)
+        os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Swap the CURRENT pointer atomically
+    pointer_tmp = os.path.join(snapshot_root, 'CURRENT.tmp')
+    with open(pointer_tmp, 'w') as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(snapshot_root, 'CURRENT'))
+
+    # /api/analytics/spend caches service answers under the dataset epoch; without a
+    # bump, answers from the previous snapshot would stay cached until the next import
+    with conn.cursor() as cur:
+        record_epoch(cur, 'analytics_snapshot', [])
+    conn.commit()
+
+    prune_snapshots(snapshot_root, keep=KEEP_SNAPSHOTS)
+    print(f"Analytics snapshot {name} built with {row_count} rows")
+    return final_dir
+
+def prune_snapshots(snapshot_root=SNAPSHOT_ROOT, keep=KEEP_SNAPSHOTS):
+    """Remove all but the newest `keep` snapshots"""
+    snapshots = sorted(
+        d for d in os.listdir(snapshot_root)
+        if d.startswith('snapshot-') and not d.endswith('.tmp')
+    )
+    for old in snapshots[:-keep]:
+        shutil.rmtree(os.path.join(snapshot_root, old), ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the analytics columnar snapshot')
+    parser.add_argument('--db-url', help='Database URL (defaults to SUPABASE_DB_URL or the local database)')
+    parser.add_argument('--output', default=SNAPSHOT_ROOT, help='Snapshot root directory')
+    args = parser.parse_args()
+
+    conn = get_connection(args.db_url)
+    try:
+        build_snapshot(conn, args.output)
+    except Exception as e:
+        print(f"Error building analytics snapshot: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
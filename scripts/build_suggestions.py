@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Build the prefix-indexed autocomplete suggestion index served by /api/suggest
+
+For each field (agency, sub_tier, office, awardee, naics, city) the index
+holds the distinct values ranked by contract count, a sorted list of
+lowercase search keys (the full label plus every word-start suffix, so
+"defense" finds "Dept of Defense"), and precomputed top-K lists for every
+prefix whose key range is longer than SCAN_LIMIT. /api/suggest scans the
+key range of any other prefix in full, so every answer is the exact top-K.
+"""
+import os
+import sys
+import json
+import heapq
+import argparse
+from bisect import bisect_left
+from datetime import datetime
+
+from db_utils import get_connection
+
+INDEX_PATH = os.getenv(
+    'SUGGEST_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'suggestions.json')
+)
+
+# Prefixes matching more keys than this get a precomputed top-K list
+SCAN_LIMIT = 1000
+# Must be at least the limit cap of /api/suggest (MAX_SUGGESTIONS in src/lib/suggestions.ts)
+TOP_K = 50
+
+FIELD_QUERIES = {
+    'agency': """
+        SELECT department_agency, department_agency, NULL, COUNT(*)
+        FROM contracts
+        WHERE department_agency IS NOT NULL AND department_agency <> ''
+        GROUP BY department_agency
+    """,
+    'sub_tier': """
+        SELECT sub_tier, sub_tier, MIN(department_agency), COUNT(*)
+        FROM contracts
+        WHERE sub_tier IS NOT NULL AND sub_tier <> ''
+        GROUP BY sub_tier
+    """,
+    'office': """
+        SELECT office, office, MIN(sub_tier), COUNT(*)
+        FROM contracts
+        WHERE office IS NOT NULL AND office <> ''
+        GROUP BY office
+    """,
+    'awardee': """
+        SELECT awardee, awardee, NULL, COUNT(*)
+        FROM contracts
+        WHERE awardee IS NOT NULL AND awardee <> ''
+        GROUP BY awardee
+    """,
+    'naics': """
+        SELECT c.naics_code, c.naics_code || COALESCE(' - ' || MIN(n.title), ''), NULL, COUNT(*)
+        FROM contracts c
+        LEFT JOIN naics_codes n ON n.code = c.naics_code
+        WHERE c.naics_code IS NOT NULL AND c.naics_code <> ''
+        GROUP BY c.naics_code
+    """,
+    'city': """
+        SELECT city, city || ', ' || state, state, COUNT(*)
+        FROM contracts
+        WHERE city IS NOT NULL AND city <> '' AND state IS NOT NULL
+        GROUP BY city, state
+    """,
+}
+
+def search_keys(*texts):
+    """Lowercase keys for every word start of the given texts"""
+    keys = set()
+    for text in texts:
+        if not text:
+            continue
+        words = text.lower().split()
+        for i in range(len(words)):
+            keys.add(' '.join(words[i:]))
+    return keys
+
+def top_lists(keys, scan_limit=SCAN_LIMIT, k=TOP_K):
+    """Best k entry indexes for every prefix whose range of sorted keys is longer than scan_limit"""
+    names = [key for key, _ in keys]
+    top = {}
+    # (lo, hi, length): keys[lo:hi] share a prefix of length - 1; split them on the next character
+    pending = [(0, len(keys), 1)]
+    while pending:
+        lo, hi, length = pending.pop()
+        i = lo
+        while i < hi:
+            if len(names[i]) < length:
+                # The shared prefix itself; it sorts first in the range
+                i += 1
+                continue
+            prefix = names[i][:length]
+            end = bisect_left(names, prefix + '\U0010ffff', i, hi)
+            if end - i > scan_limit:
+                # Lower entry index means higher weight
+                top[prefix] = heapq.nsmallest(k, {idx for _, idx in keys[i:end]})
+                pending.append((i, end, length + 1))
+            i = end
+    return top
+
+def build_field_index(rows):
+    """Build one field's index from (value, label, description, weight) rows"""
+    rows = sorted(rows, key=lambda row: (-row[3], row[1]))
+    entries = [[value, label, description, int(weight)] for value, label, description, weight in rows]
+
+    keys = []
+    for idx, (value, label, description, _) in enumerate(entries):
+        for key in search_keys(value, label):
+            keys.append([key, idx])
+    keys.sort()
+    return {'entries': entries, 'keys': keys, 'top': top_lists(keys)}
+
+def build_suggestions(conn, index_path=INDEX_PATH):
+    """Build the suggestion index for every field and replace the index file atomically"""
+    print("Building autocomplete suggestion index...")
+    fields = {}
+    with conn.cursor() as cur:
+        for field, query in FIELD_QUERIES.items():
+            cur.execute(query)
+            fields[field] = build_field_index(cur.fetchall())
+            print(f"  {field}: {len(fields[field]['entries'])} values")
+    conn.commit()
+
+    index = {
+        'built_at': datetime.now().isoformat(),
+        'scan_limit': SCAN_LIMIT,
+        'top_k': TOP_K,
+        'fields': fields,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, index_path)
+    print(f"Suggestion index written to {index_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the autocomplete suggestion index')
+    parser.add_argument('--db-url', help='Database URL (defaults to SUPABASE_DB_URL or the local database)')
+    parser.add_argument('--output', default=INDEX_PATH, help='Path of the suggestion index JSON')
+    args = parser.parse_args()
+
+    conn = get_connection(args.db_url)
+    try:
+        build_suggestions(conn, args.output)
+    except Exception as e:
+        print(f"Error building suggestion index: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Dataset epoch bookkeeping for API cache invalidation
+
+Every import commit calls record_epoch() inside its transaction. It inserts a
+new dataset_epochs row (the API routes key their ETags and in-process result
+cache on the latest epoch) and logs the affected notice_ids in
+dataset_changes, along with the dimension values the commit touched.
+"""
+import json
+from psycopg2.extras import execute_values
+
+def changed_dimensions(records, fields):
+    """Collect distinct values per dimension, e.g. fields={'state': 40, 'naics_code': 17}"""
+    dimensions = {}
+    for name, idx in fields.items():
+        values = {record[idx] for record in records if record[idx]}
+        dimensions[name] = sorted(str(v) for v in values)
+    return dimensions
+
+def record_epoch(cur, source, notice_ids, dimensions=None):
+    """Bump the dataset epoch and log the change; call before the commit it describes"""
+    notice_ids = sorted({n for n in notice_ids if n})
+    cur.execute("""
+        INSERT INTO dataset_epochs (source, row_count, dimensions)
+        VALUES (%s, %s, %s)
+        RETURNING epoch
+    """, (source, len(notice_ids), json.dumps(dimensions or {})))
+    epoch = cur.fetchone()[0]
+    if notice_ids:
+        execute_values(cur, """
+            INSERT INTO dataset_changes (epoch, notice_id) VALUES %s
+        """, [(epoch, notice_id) for notice_id in notice_ids], page_size=1000)
+    return epoch
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Order bulk-load records by posted_date before they are written
+
+Rows written in date order land in date-ordered heap pages, which is what
+lets the BRIN indexes on posted_date (supabase/migrations/006) skip every
+block range outside a year or month filter. sorted_by_date() is an external
+merge sort: records are sorted in runs of run_size, spilled to temporary
+files and merged back, so an extract of any size sorts in bounded memory.
+"""
+import heapq
+import pickle
+import tempfile
+from datetime import date, datetime, timezone
+from itertools import islice
+
+RUN_SIZE = 200000
+
+def date_key(value):
+    """Sort key placing rows without a date last, as ORDER BY ... NULLS LAST does"""
+    if value is None:
+        return (1, datetime.min)
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        # Aware and naive timestamps are mixed in the extracts and cannot be compared
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (0, value)
+
+def _spill(run):
+    spill = tempfile.TemporaryFile()
+    for record in run:
+        pickle.dump(record, spill, pickle.HIGHEST_PROTOCOL)
+    spill.seek(0)
+    return spill
+
+def _read_run(spill):
+    while True:
+        try:
+            yield pickle.load(spill)
+        except EOFError:
+            spill.close()
+            return
+
+def sorted_by_date(records, index, run_size=RUN_SIZE):
+    """Yield records (tuples) ordered by the date at position index, stable for ties"""
+    key = lambda record: date_key(record[index])
+    records = iter(records)
+    spills = []
+    while True:
+        run = sorted(islice(records, run_size), key=key)
+        if not run:
+            break
+        if len(run) < run_size and not spills:
+            # Everything fit in one run; no need to touch disk
+            yield from run
+            return
+        spills.append(_spill(run))
+    yield from heapq.merge(*(_read_run(spill) for spill in spills), key=key)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Shared database connection settings for the import and maintenance scripts
+"""
+import os
+import psycopg2
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Local docker-compose database (scripts/docker-compose.yml)
+DB_PARAMS = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': int(os.getenv('DB_PORT', 5432)),
+    'database': os.getenv('DB_NAME', 'govchime'),
+    'user': os.getenv('DB_USER', 'govchime'),
+    'password': os.getenv('DB_PASSWORD', 'govchime_secure_password')
+}
+
+# Supabase connection string, takes precedence over DB_PARAMS when set
+SUPABASE_DB_URL = os.getenv('SUPABASE_DB_URL')
+
+def get_connection(db_url=None):
+    """Connect to the given URL, SUPABASE_DB_URL, or the local database"""
+    db_url = db_url or SUPABASE_DB_URL
+    if db_url:
+        return psycopg2.connect(db_url)
+    return psycopg2.connect(**DB_PARAMS)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+In-memory dictionary encoding of the agency / office / type dimensions
+
+After supabase/migrations/005_dimension_tables.sql, contract rows live in
+contract_facts with small integer keys into the dim_* tables, and the
+contracts view joins the names back. DimensionEncoder loads every dimension
+table once, resolves names to keys from memory during a load and only goes
+to the database for values it has not seen before.
+"""
+
+# Text column of the contracts view -> dimension table; the key column is <column>_id
+DIMENSION_TABLES = {
+    'department_agency': 'dim_department_agency',
+    'sub_tier': 'dim_sub_tier',
+    'office': 'dim_office',
+    'fullparentpathname': 'dim_fullparentpathname',
+    'organization_type': 'dim_organization_type',
+    'type': 'dim_type',
+}
+
+# Column order of the record tuples built by the Supabase importers
+CONTRACT_COLUMNS = [
+    'notice_id', 'title', 'sol_number', 'fullparentpathname', 'fullparentpathcode',
+    'posted_date', 'type', 'base_type', 'archive_type', 'archive_date',
+    'set_aside_description', 'set_aside', 'response_deadline',
+    'naics_code', 'naics_description', 'classification_code', 'classification_description',
+    'pop_start_date', 'pop_end_date', 'pop_address', 'pop_city', 'pop_state', 'pop_zip', 'pop_country',
+    'active', 'award_number', 'award_amount', 'awardee', 'awardee_duns', 'awardee_location',
+    'awardee_city', 'awardee_state', 'awardee_zip', 'description',
+    'organization_type', 'ui_link', 'link', 'additional_reporting',
+    'fpds_code', 'fpds_description', 'office_address', 'office',
+    'city', 'state', 'zip', 'country_code', 'department_agency', 'sub_tier',
+]
+
+def build_insert_query(table, columns):
+    """Upsert of record tuples into contracts, or contract_facts once dimensions are encoded"""
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON CONFLICT (notice_id) DO UPDATE SET
+            title = EXCLUDED.title,
+            award_amount = EXCLUDED.award_amount,
+            awardee = EXCLUDED.awardee
+    """
+
+def has_dimension_tables(cur):
+    """True once contracts has been split into contract_facts + dimension tables"""
+    cur.execute("SELECT to_regclass('contract_facts') IS NOT NULL")
+    return cur.fetchone()[0]
+
+def facts_table(cur):
+    """Physical table behind contracts, for writes the compatibility view cannot take"""
+    return 'contract_facts' if has_dimension_tables(cur) else 'contracts'
+
+class DimensionEncoder:
+    """Resolves dimension names to integer keys through in-memory dictionaries"""
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.keys = {}
+        for column, table in DIMENSION_TABLES.items():
+            cur.execute(f"SELECT name, id FROM {table}")
+            self.keys[column] = dict(cur.fetchall())
+
+    def key(self, column, name):
+        """Return the key of name in column's dimension, inserting it if new"""
+        if name is None:
+            return None
+        keys = self.keys[column]
+        key = keys.get(name)
+        if key is None:
+            self.cur.execute(f"""
+                INSERT INTO {DIMENSION_TABLES[column]} (name)
+                VALUES (%s)
+                ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                RETURNING id
+            """, (name,))
+            key = keys[name] = self.cur.fetchone()[0]
+        return key
+
+    def encode_columns(self, columns):
+        """Map a contracts column list to contract_facts, e.g. office -> office_id"""
+        return [f"{c}_id" if c in DIMENSION_TABLES else c for c in columns]
+
+    def encode_record(self, columns, record):
+        """Replace the dimension names in a record tuple with their keys"""
+        return tuple(
+            self.key(column, value) if column in DIMENSION_TABLES else value
+            for column, value in zip(columns, record)
+        )
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Stream filtered contracts to CSV, NDJSON or Parquet
+
+Takes the same filters as /api/contracts (ContractFilters) and streams the
+whole result in constant memory: CSV through COPY ... TO STDOUT, NDJSON
+through a server-side cursor over row_to_json(), Parquet (needs pyarrow)
+through a server-side cursor written one row group per batch.
+
+    python export_contracts.py --state VA --naics-code 541511 -o va_541511.csv
+    python export_contracts.py --keyword cybersecurity --posted-date-from 2024-01-01 --format ndjson > out.ndjson
+    python export_contracts.py --department-agency "DEPT OF DEFENSE" --format parquet -o dod.parquet
+
+Progress goes to stderr so CSV / NDJSON can be piped from stdout.
+"""
+import sys
+import time
+import argparse
+
+from db_utils import get_connection
+
+FORMATS = ('csv', 'ndjson', 'parquet')
+
+# Columns --sort-by accepts (interpolated into ORDER BY, so whitelisted)
+SORTABLE_COLUMNS = ('posted_date', 'response_deadline', 'award_amount', 'notice_id', 'title', 'department_agency')
+
+BATCH_SIZE = 50000
+
+def build_filter_sql(filters):
+    """Return (where_clause, params) for a ContractFilters-style dict, matching /api/contracts"""
+    conditions = []
+    params = {}
+
+    if filters.get('keyword'):
+        conditions.append(
+            "(title ILIKE %(keyword)s OR description ILIKE %(keyword)s OR department_agency ILIKE %(keyword)s "
+            "OR sub_tier ILIKE %(keyword)s OR office ILIKE %(keyword)s)"
+        )
+        params['keyword'] = f"%{filters['keyword']}%"
+
+    for column in ('type', 'department_agency', 'sub_tier', 'set_aside', 'naics_code', 'state'):
+        if filters.get(column):
+            conditions.append(f"{column} = %({column})s")
+            params[column] = filters[column]
+
+    if filters.get('city'):
+        conditions.append("city ILIKE %(city)s")
+        params['city'] = f"{filters['city']}%"
+
+    for column in ('posted_date', 'response_deadline'):
+        if filters.get(f"{column}_from"):
+            conditions.append(f"{column} >= %({column}_from)s")
+            params[f"{column}_from"] = filters[f"{column}_from"]
+        if filters.get(f"{column}_to"):
+            conditions.append(f"{column} <= %({column}_to)s")
+            params[f"{column}_to"] = filters[f"{column}_to"]
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    return where, params
+
+def build_export_query(filters, sort_by=None, sort_order='desc'):
+    where, params = build_filter_sql(filters)
+    order = ''
+    if sort_by:
+        if sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by}; choose from {', '.join(SORTABLE_COLUMNS)}")
+        direction = 'ASC' if sort_order == 'asc' else 'DESC'
+        order = f"ORDER BY {sort_by} {direction} NULLS LAST"
+    return f"SELECT * FROM contracts {where} {order}".strip(), params
+
+def export_csv(conn, sql, params, out):
+    """COPY streams rows already formatted by the server; nothing is buffered here"""
+    with conn.cursor() as cur:
+        query = cur.mogrify(sql, params).decode()
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+        return cur.rowcount
+
+def export_ndjson(conn, sql, params, out, batch_size=BATCH_SIZE):
+    rows = 0
+    with conn.cursor(name='contracts_export') as cur:
+        cur.itersize = batch_size
+        cur.execute(f"SELECT row_to_json(c)::text FROM ({sql}) c", params)
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            out.write(''.join(f"{line}\n" for (line,) in batch))
+            rows += len(batch)
+            print(f"  {rows:,} rows...", file=sys.stderr)
+    return rows
+
+# PostgreSQL type name -> (pyarrow type, converter for values pyarrow cannot take as-is)
+def _arrow_types(pa):
+    return {
+        'bool': (pa.bool_(), None),
+        'int2': (pa.int16(), None),
+        'int4': (pa.int32(), None),
+        'int8': (pa.int64(), None),
+        'float4': (pa.float32(), None),
+        'float8': (pa.float64(), None),
+        'numeric': (pa.float64(), float),
+        'date': (pa.date32(), None),
+        'timestamp': (pa.timestamp('us'), None),
+        'timestamptz': (pa.timestamp('us', tz='UTC'), None),
+    }
+
+def export_parquet(conn, sql, params, path, batch_size=BATCH_SIZE):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+    type_map = _arrow_types(pa)
+    rows = 0
+    writer = None
+    try:
+        with conn.cursor(name='contracts_export') as cur:
+            cur.itersize = batch_size
+            cur.execute(sql, params)
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if writer is None:
+                    # The description is only available once the first batch is fetched
+                    with conn.cursor() as type_cur:
+                        oids = [column.type_code for column in cur.description]
+                        type_cur.execute("SELECT oid, typname FROM pg_type WHERE oid = ANY(%s)", (oids,))
+                        type_names = dict(type_cur.fetchall())
+                    columns = [
+                        (column.name,) + type_map.get(type_names.get(column.type_code), (pa.string(), str))
+                        for column in cur.description
+                    ]
+                    schema = pa.schema([(name, arrow_type) for name, arrow_type, _ in columns])
+                    writer = pq.ParquetWriter(path, schema, compression='snappy')
+                if not batch:
+                    break
+
+                arrays = []
+                for idx, (_, arrow_type, convert) in enumerate(columns):
+                    values = [row[idx] for row in batch]
+                    if convert:
+                        values = [None if v is None else convert(v) for v in values]
+                    arrays.append(pa.array(values, type=arrow_type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                rows += len(batch)
+                print(f"  {rows:,} rows...", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def export_contracts(conn, filters, fmt='csv', output=None, sort_by=None, sort_order='desc',
+                     batch_size=BATCH_SIZE):
+    """Export contracts matching filters to output (a path, or stdout for csv / ndjson)"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt}; choose from {', '.join(FORMATS)}")
+    sql, params = build_export_query(filters, sort_by, sort_order)
+
+    # Read-only, repeatable-read snapshot so a long export sees one consistent dataset
+    conn.set_session(readonly=True, isolation_level='REPEATABLE READ')
+
+    if fmt == 'parquet':
+        if not output:
+            raise ValueError("Parquet export needs an output path")
+        return export_parquet(conn, sql, params, output, batch_size)
+
+    out = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    try:
+        if fmt == 'csv':
+            return export_csv(conn, sql, params, out)
+        return export_ndjson(conn, sql, params, out, batch_size)
+    finally:
+        if output:
+            out.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Export filtered contracts as CSV, NDJSON or Parquet')
+    parser.add_argument('--keyword')
+    parser.add_argument('--type')
+    parser.add_argument('--department-agency')
+    parser.add_argument('--sub-tier')
+    parser.add_argument('--set-aside')
+    parser.add_argument('--naics-code')
+    parser.add_argument('--state')
+    parser.add_argument('--city', help='City prefix')
+    parser.add_argument('--posted-date-from')
+    parser.add_argument('--posted-date-to')
+    parser.add_argument('--response-deadline-from')
+    parser.add_argument('--response-deadline-to')
+    parser.add_argument('--sort-by', choices=SORTABLE_COLUMNS,
+                        help='Order the export (default: unordered, which streams fastest)')
+    parser.add_argument('--sort-order', choices=('asc', 'desc'), default='desc')
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout, except for parquet)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--db-url', help='Database URL (defaults to SUPABASE_DB_URL or the local database)')
+    args = parser.parse_args()
+
+    filters = {
+        name: getattr(args, name)
+        for name in ('keyword', 'type', 'department_agency', 'sub_tier', 'set_aside', 'naics_code',
+                     'state', 'city', 'posted_date_from', 'posted_date_to',
+                     'response_deadline_from', 'response_deadline_to')
+    }
+
+    conn = get_connection(args.db_url)
+    start = time.time()
+    try:
+        rows = export_contracts(conn, filters, args.format, args.output, args.sort_by,
+                                args.sort_order, args.batch_size)
+        print(f"Exported {rows:,} contracts in {time.time() - start:.1f}s", file=sys.stderr)
+    except Exception as e:
+        print(f"Error exporting contracts: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,13 @@ from psycopg2.extras import execute_batch
 from datetime import datetime
 from dotenv import load_dotenv
 
+from dataset_epoch import record_epoch, changed_dimensions
+from date_order import date_key
+from resolve_awardees import resolve_awardees
+from build_suggestions import build_suggestions
+from analytics_snapshot import build_snapshot
+from dimensions import CONTRACT_COLUMNS, DimensionEncoder, build_insert_query, has_dimension_tables
+
 load_dotenv()
 
 SUPABASE_DB_URL = os.getenv('SUPABASE_DB_URL')
@@ -17,6 +24,15 @@ if not SUPABASE_DB_URL:
     print("Error: SUPABASE_DB_URL not set")
     sys.exit(1)
 
+# Positions in the record tuple of the dimensions logged with each dataset epoch
+EPOCH_DIMENSIONS = {
+    'naics_code': 13,
+    'awardee': 27,
+    'state': 43,
+    'department_agency': 46,
+    'sub_tier': 47,
+}
+
 def clean_value(value):
     """Clean and prepare values for database insertion"""
     if pd.isna(value) or value == '' or value == 'NA':
@@ -58,6 +74,17 @@ def main():
     conn = psycopg2.connect(SUPABASE_DB_URL)
     print("Connected!")
     
+    # Resolve agency / office / type names to dimension keys in memory when the
+    # schema has been dictionary-encoded (supabase/migrations/005_dimension_tables.sql)
+    dim_cur = conn.cursor()
+    if has_dimension_tables(dim_cur):
+        encoder = DimensionEncoder(dim_cur)
+        insert_query = build_insert_query('contract_facts', encoder.encode_columns(CONTRACT_COLUMNS))
+        print("Encoding dimension columns into contract_facts")
+    else:
+        encoder = None
+        insert_query = build_insert_query('contracts', CONTRACT_COLUMNS)
+    
     csv_file = 'data/FY2020_archived_opportunities.csv'
     
     # First, get a sample to see columns
@@ -143,6 +170,8 @@ def main():
             
             # Bulk insert
             if records:
+                # Chunks arrive in file order; at least write each one by posted_date
+                records.sort(key=lambda record: date_key(record[5]))
                 cur = conn.cursor()
                 
                 # First, ensure all NAICS codes exist
@@ -171,32 +200,11 @@ def main():
                             VALUES (%s, %s)
                             ON CONFLICT (code) DO NOTHING
                         """, (state, state))  # Use code as name for now
-                insert_query = """
-                    INSERT INTO contracts (
-                        notice_id, title, sol_number, fullparentpathname, fullparentpathcode,
-                        posted_date, type, base_type, archive_type, archive_date,
-                        set_aside_description, set_aside, response_deadline,
-                        naics_code, naics_description, classification_code, classification_description,
-                        pop_start_date, pop_end_date, pop_address, pop_city, pop_state, pop_zip, pop_country,
-                        active, award_number, award_amount, awardee, awardee_duns, awardee_location,
-                        awardee_city, awardee_state, awardee_zip, description,
-                        organization_type, ui_link, link, additional_reporting,
-                        fpds_code, fpds_description, office_address, office,
-                        city, state, zip, country_code, department_agency, sub_tier
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    ON CONFLICT (notice_id) DO UPDATE SET
-                        title = EXCLUDED.title,
-                        award_amount = EXCLUDED.award_amount,
-                        awardee = EXCLUDED.awardee
-                """
-                
-                execute_batch(cur, insert_query, records, page_size=100)
+                rows = [encoder.encode_record(CONTRACT_COLUMNS, r) for r in records] if encoder else records
+                execute_batch(cur, insert_query, rows, page_size=100)
+                # Log names from the records before encoding, as import_to_supabase.py does
+                record_epoch(cur, 'import_contracts_chunked', [r[0] for r in records],
+                             changed_dimensions(records, EPOCH_DIMENSIONS))
                 conn.commit()
                 cur.close()
                 
@@ -212,6 +220,30 @@ def main():
         print(f"Error: {e}")
         conn.rollback()
     
+    # Resolve awardee name variants to the awardee_ids the contractor analysis groups on
+    print("\nResolving awardees...")
+    try:
+        resolve_awardees(conn)
+    except Exception as e:
+        print(f"Warning: awardees not resolved: {e}")
+        conn.rollback()
+    
+    # Rebuild the autocomplete suggestion index
+    print("\nBuilding suggestion index...")
+    try:
+        build_suggestions(conn)
+    except Exception as e:
+        print(f"Warning: suggestion index not rebuilt: {e}")
+        conn.rollback()
+    
+    # Rebuild the analytics service snapshot
+    print("\nBuilding analytics snapshot...")
+    try:
+        build_snapshot(conn)
+    except Exception as e:
+        print(f"Warning: analytics snapshot not rebuilt: {e}")
+        conn.rollback()
+    
     # Check final count
     cur = conn.cursor()
     cur.execute("SELECT COUNT(*) FROM contracts")
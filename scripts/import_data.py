@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 import csv
 import psycopg2
+from psycopg2.extras import execute_values
 from datetime import datetime
 import sys
 from decimal import Decimal
 import re
 import pandas as pd
 import os
+import argparse
+from contextlib import nullcontext
+
+from analytics_snapshot import build_snapshot
+from resolve_awardees import resolve_awardees
+from build_suggestions import build_suggestions
+from index_maintenance import deferred_indexes
+from dataset_epoch import record_epoch, changed_dimensions
+from date_order import sorted_by_date
 
 # Database connection parameters
 DB_PARAMS = {
@@ -17,6 +27,17 @@ DB_PARAMS = {
     'password': os.getenv('DB_PASSWORD', 'govchime_secure_password')
 }
 
+# Positions in the insert tuple of the dimensions logged with each dataset epoch
+EPOCH_DIMENSIONS = {
+    'department_agency': 3,
+    'sub_tier': 5,
+    'naics_code': 17,
+    'awardee': 28,
+    'state': 40,
+}
+
+POSTED_DATE_INDEX = 9
+
 def clean_decimal(value):
     """Clean and convert string to decimal"""
     if not value or value == 'N/A':
@@ -99,8 +120,72 @@ def import_naics_codes(xlsx_file, conn):
         print(f"Error importing NAICS codes: {e}")
         conn.rollback()
 
-def import_contracts_csv(csv_file, batch_size=1000):
-    """Import CSV data into PostgreSQL database"""
+def build_record(row):
+    """Map a SAM.gov CSV row to the contracts insert tuple"""
+    return (
+        row.get('NoticeId'),
+        row.get('Title'),
+        row.get('Sol#'),
+        row.get('Department/Ind.Agency'),
+        row.get('CGAC'),
+        row.get('Sub-Tier'),
+        row.get('FPDS Code'),
+        row.get('Office'),
+        row.get('AAC Code'),
+        parse_date(row.get('PostedDate')),
+        row.get('Type'),
+        row.get('BaseType'),
+        row.get('ArchiveType'),
+        parse_date(row.get('ArchiveDate')),
+        row.get('SetASideCode'),
+        row.get('SetASide'),
+        parse_date(row.get('ResponseDeadLine')),
+        row.get('NaicsCode'),
+        row.get('ClassificationCode'),
+        row.get('PopStreetAddress'),
+        row.get('PopCity'),
+        row.get('PopState'),
+        row.get('PopZip'),
+        row.get('PopCountry'),
+        parse_boolean(row.get('Active')),
+        row.get('AwardNumber'),
+        parse_date(row.get('AwardDate')),
+        clean_decimal(row.get('Award$')),
+        row.get('Awardee'),
+        row.get('PrimaryContactTitle'),
+        row.get('PrimaryContactFullname'),
+        row.get('PrimaryContactEmail'),
+        row.get('PrimaryContactPhone'),
+        row.get('PrimaryContactFax'),
+        row.get('SecondaryContactTitle'),
+        row.get('SecondaryContactFullname'),
+        row.get('SecondaryContactEmail'),
+        row.get('SecondaryContactPhone'),
+        row.get('SecondaryContactFax'),
+        row.get('OrganizationType'),
+        row.get('State'),
+        row.get('City'),
+        row.get('ZipCode'),
+        row.get('CountryCode'),
+        row.get('AdditionalInfoLink'),
+        row.get('Link'),
+        row.get('Description')
+    )
+
+def insert_batch(cursor, insert_query, batch):
+    """Insert a batch and log an epoch for the rows ON CONFLICT did not skip; returns the inserted count"""
+    inserted = {row[0] for row in execute_values(cursor, insert_query, batch, page_size=1000, fetch=True)}
+    changed = [record for record in batch if record[0] in inserted]
+    record_epoch(cursor, 'import_data', inserted, changed_dimensions(changed, EPOCH_DIMENSIONS))
+    return len(inserted)
+
+def import_contracts_csv(csv_file, batch_size=1000, full_load=False, sort_by_date=True):
+    """Import CSV data into PostgreSQL database
+
+    With full_load, secondary indexes on contracts are dropped for the load
+    and rebuilt in parallel afterwards (see index_maintenance.py). With
+    sort_by_date, rows are written in posted_date order (see date_order.py).
+    """
     
     conn = None
     cursor = None
@@ -117,7 +202,8 @@ def import_contracts_csv(csv_file, batch_size=1000):
             import_naics_codes(naics_file, conn)
         
         # Open CSV file
-        with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f:
+        index_mode = deferred_indexes(conn, 'contracts', lambda: psycopg2.connect(**DB_PARAMS)) if full_load else nullcontext()
+        with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f, index_mode:
             reader = csv.DictReader(f)
             
             insert_query = """
@@ -133,13 +219,9 @@ def import_contracts_csv(csv_file, batch_size=1000):
                     secondary_contact_fullname, secondary_contact_email, secondary_contact_phone,
                     secondary_contact_fax, organization_type, state, city, zip_code,
                     country_code, additional_info_link, link, description
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s
-                ) ON CONFLICT (notice_id) DO NOTHING
+                ) VALUES %s
+                ON CONFLICT (notice_id) DO NOTHING
+                RETURNING notice_id
             """
             
             batch = []
@@ -148,86 +230,67 @@ def import_contracts_csv(csv_file, batch_size=1000):
             
             print("Starting data import...")
             
-            for row in reader:
+            records = (build_record(row) for row in reader)
+            if sort_by_date:
+                # Date-ordered heap pages keep the posted_date BRIN ranges narrow
+                print("Sorting extract by posted_date...")
+                records = sorted_by_date(records, POSTED_DATE_INDEX)
+            
+            for data in records:
                 total_rows += 1
-                
-                # Prepare data tuple
-                data = (
-                    row.get('NoticeId'),
-                    row.get('Title'),
-                    row.get('Sol#'),
-                    row.get('Department/Ind.Agency'),
-                    row.get('CGAC'),
-                    row.get('Sub-Tier'),
-                    row.get('FPDS Code'),
-                    row.get('Office'),
-                    row.get('AAC Code'),
-                    parse_date(row.get('PostedDate')),
-                    row.get('Type'),
-                    row.get('BaseType'),
-                    row.get('ArchiveType'),
-                    parse_date(row.get('ArchiveDate')),
-                    row.get('SetASideCode'),
-                    row.get('SetASide'),
-                    parse_date(row.get('ResponseDeadLine')),
-                    row.get('NaicsCode'),
-                    row.get('ClassificationCode'),
-                    row.get('PopStreetAddress'),
-                    row.get('PopCity'),
-                    row.get('PopState'),
-                    row.get('PopZip'),
-                    row.get('PopCountry'),
-                    parse_boolean(row.get('Active')),
-                    row.get('AwardNumber'),
-                    parse_date(row.get('AwardDate')),
-                    clean_decimal(row.get('Award$')),
-                    row.get('Awardee'),
-                    row.get('PrimaryContactTitle'),
-                    row.get('PrimaryContactFullname'),
-                    row.get('PrimaryContactEmail'),
-                    row.get('PrimaryContactPhone'),
-                    row.get('PrimaryContactFax'),
-                    row.get('SecondaryContactTitle'),
-                    row.get('SecondaryContactFullname'),
-                    row.get('SecondaryContactEmail'),
-                    row.get('SecondaryContactPhone'),
-                    row.get('SecondaryContactFax'),
-                    row.get('OrganizationType'),
-                    row.get('State'),
-                    row.get('City'),
-                    row.get('ZipCode'),
-                    row.get('CountryCode'),
-                    row.get('AdditionalInfoLink'),
-                    row.get('Link'),
-                    row.get('Description')
-                )
-                
                 batch.append(data)
                 
                 # Execute batch insert
                 if len(batch) >= batch_size:
-                    cursor.executemany(insert_query, batch)
+                    inserted_rows += insert_batch(cursor, insert_query, batch)
                     conn.commit()
-                    inserted_rows += len(batch)
                     print(f"Processed {total_rows} rows, inserted {inserted_rows}...")
                     batch = []
             
             # Insert remaining records
             if batch:
-                cursor.executemany(insert_query, batch)
+                inserted_rows += insert_batch(cursor, insert_query, batch)
                 conn.commit()
-                inserted_rows += len(batch)
             
             print(f"\nImport complete!")
             print(f"Total rows processed: {total_rows}")
             print(f"Total rows inserted: {inserted_rows}")
             
-            # Refresh materialized views
-            print("\nRefreshing materialized views...")
+        # Resolve awardee name variants to stable awardee_ids; the rows are already committed,
+        # so a failure here only skips this stage
+        print("\nResolving awardees...")
+        try:
+            resolve_awardees(conn)
+        except Exception as e:
+            print(f"Warning: awardees not resolved: {e}")
+            conn.rollback()
+        
+        # Refresh materialized views; a failure here must not skip the index and snapshot stages
+        print("\nRefreshing materialized views...")
+        try:
             cursor.execute("SELECT refresh_materialized_views()")
             conn.commit()
             print("Materialized views refreshed successfully!")
-            
+        except Exception as e:
+            print(f"Warning: materialized views not refreshed: {e}")
+            conn.rollback()
+        
+        # Rebuild the autocomplete suggestion index
+        print("\nBuilding suggestion index...")
+        try:
+            build_suggestions(conn)
+        except Exception as e:
+            print(f"Warning: suggestion index not rebuilt: {e}")
+            conn.rollback()
+        
+        # Last stage: rebuild the analytics service snapshot
+        print("\nBuilding analytics snapshot...")
+        try:
+            build_snapshot(conn)
+        except Exception as e:
+            print(f"Warning: analytics snapshot not rebuilt: {e}")
+            conn.rollback()
+        
     except Exception as e:
         print(f"Error: {e}")
         if conn:
@@ -247,7 +310,16 @@ if __name__ == "__main__":
         print("Please install pandas: pip install pandas openpyxl")
         sys.exit(1)
     
-    csv_file = sys.argv[1] if len(sys.argv) > 1 else '../data/FY2020_archived_opportunities.csv'
-    print(f"Starting import of {csv_file}...")
-    import_contracts_csv(csv_file)
+    parser = argparse.ArgumentParser(description='Import contract opportunities into PostgreSQL')
+    parser.add_argument('csv_file', nargs='?', default='../data/FY2020_archived_opportunities.csv')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--full-load', action='store_true',
+                        help='Drop secondary indexes during the load and rebuild them in parallel afterwards')
+    parser.add_argument('--no-date-sort', action='store_true',
+                        help='Insert rows in file order instead of sorting the extract by posted_date')
+    args = parser.parse_args()
+    
+    print(f"Starting import of {args.csv_file}...")
+    import_contracts_csv(args.csv_file, batch_size=args.batch_size, full_load=args.full_load,
+                         sort_by_date=not args.no_date_sort)
     print("Import process completed!")
\ No newline at end of file
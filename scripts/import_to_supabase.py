@@ -11,6 +11,13 @@ from datetime import datetime
 import pandas as pd
 from dotenv import load_dotenv
 
+from dataset_epoch import record_epoch, changed_dimensions
+from date_order import date_key
+from resolve_awardees import resolve_awardees
+from build_suggestions import build_suggestions
+from analytics_snapshot import build_snapshot
+from dimensions import CONTRACT_COLUMNS, DimensionEncoder, build_insert_query, has_dimension_tables
+
 # Load environment variables
 load_dotenv()
 
@@ -23,6 +30,15 @@ if not SUPABASE_DB_URL:
     print("Get your database URL from: https://app.supabase.com/project/[your-project]/settings/database")
     sys.exit(1)
 
+# Positions in the record tuple of the dimensions logged with each dataset epoch
+EPOCH_DIMENSIONS = {
+    'naics_code': 13,
+    'awardee': 27,
+    'state': 43,
+    'department_agency': 46,
+    'sub_tier': 47,
+}
+
 def clean_value(value):
     """Clean and prepare values for database insertion"""
     if pd.isna(value) or value == '' or value == 'NA':
@@ -144,36 +160,24 @@ def import_contracts(conn, limit=None):
         df = df.head(limit)
         print(f"Limiting import to {limit} records")
     
-    # Prepare the insert query
-    insert_query = """
-        INSERT INTO contracts (
-            notice_id, title, sol_number, fullparentpathname, fullparentpathcode,
-            posted_date, type, base_type, archive_type, archive_date,
-            set_aside_description, set_aside, response_deadline,
-            naics_code, naics_description, classification_code, classification_description,
-            pop_start_date, pop_end_date, pop_address, pop_city, pop_state, pop_zip, pop_country,
-            active, award_number, award_amount, awardee, awardee_duns, awardee_location,
-            awardee_city, awardee_state, awardee_zip, description,
-            organization_type, ui_link, link, additional_reporting,
-            fpds_code, fpds_description, office_address, office,
-            city, state, zip, country_code, department_agency, sub_tier
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        ON CONFLICT (notice_id) DO UPDATE SET
-            title = EXCLUDED.title,
-            award_amount = EXCLUDED.award_amount,
-            awardee = EXCLUDED.awardee
-    """
+    # Write rows in posted_date order so the date BRIN indexes stay selective
+    date_column = next((c for c in ('postedDate', 'posted_date') if c in df.columns), None)
+    if date_column:
+        df = df.sort_values(date_column, key=lambda s: s.map(lambda v: date_key(parse_date(v))), kind='stable')
     
     successful = 0
     failed = 0
+    pending_records = []
     
     with conn.cursor() as cur:
+        # The contracts view cannot take ON CONFLICT; write contract_facts with encoded keys
+        if has_dimension_tables(cur):
+            encoder = DimensionEncoder(cur)
+            insert_query = build_insert_query('contract_facts', encoder.encode_columns(CONTRACT_COLUMNS))
+        else:
+            encoder = None
+            insert_query = build_insert_query('contracts', CONTRACT_COLUMNS)
+
         for idx, row in df.iterrows():
             try:
                 # Map CSV columns to database columns
@@ -233,11 +237,15 @@ def import_contracts(conn, limit=None):
                 if not values[0]:
                     continue
                 
-                cur.execute(insert_query, values)
+                cur.execute(insert_query, encoder.encode_record(CONTRACT_COLUMNS, values) if encoder else values)
                 successful += 1
+                pending_records.append(values)
                 
                 if successful % 1000 == 0:
+                    record_epoch(cur, 'import_to_supabase', [r[0] for r in pending_records],
+                                 changed_dimensions(pending_records, EPOCH_DIMENSIONS))
                     conn.commit()
+                    pending_records = []
                     print(f"Imported {successful} contracts...")
                     
             except Exception as e:
@@ -246,6 +254,9 @@ def import_contracts(conn, limit=None):
                     print(f"Error importing row {idx}: {e}")
                 continue
         
+        if pending_records:
+            record_epoch(cur, 'import_to_supabase', [r[0] for r in pending_records],
+                         changed_dimensions(pending_records, EPOCH_DIMENSIONS))
         conn.commit()
         print(f"\nImport complete!")
         print(f"Successfully imported: {successful} contracts")
@@ -284,9 +295,33 @@ def main():
         # Start with a smaller batch for testing
         import_contracts(conn, limit=100)  # Change to None to import all
         
+        # Resolve awardee name variants to the awardee_ids the contractor analysis groups on
+        print("\nResolving awardees...")
+        try:
+            resolve_awardees(conn)
+        except Exception as e:
+            print(f"Warning: awardees not resolved: {e}")
+            conn.rollback()
+        
         # Refresh materialized views
         refresh_materialized_views(conn)
         
+        # Rebuild the autocomplete suggestion index from the database /api/suggest falls back to
+        print("\nBuilding suggestion index...")
+        try:
+            build_suggestions(conn)
+        except Exception as e:
+            print(f"Warning: suggestion index not rebuilt: {e}")
+            conn.rollback()
+        
+        # Rebuild the analytics service snapshot
+        print("\nBuilding analytics snapshot...")
+        try:
+            build_snapshot(conn)
+        except Exception as e:
+            print(f"Warning: analytics snapshot not rebuilt: {e}")
+            conn.rollback()
+        
         # Show some statistics
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("SELECT COUNT(*) as count FROM contracts")
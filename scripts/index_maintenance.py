@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Deferred secondary-index maintenance for full reloads of the contracts table
+
+deferred_indexes() records the table's secondary index definitions, drops
+them for the duration of the load and rebuilds them afterwards in parallel
+with raised maintenance memory, then runs ANALYZE. Indexes backing
+constraints (primary key, UNIQUE notice_id used by ON CONFLICT) are kept.
+
+The definitions are also written to a state file before anything is
+dropped, together with the database they belong to, so if the process
+dies mid-load they can be restored with
+
+    python index_maintenance.py --restore
+
+--restore connects to the recorded database (the local DB_* one, or
+SUPABASE_DB_URL) and refuses to run against any other.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from db_utils import DB_PARAMS, get_connection
+
+STATE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'deferred_indexes.json'
+)
+
+REBUILD_WORKERS = 4
+MAINTENANCE_WORK_MEM = '1GB'
+
+def secondary_index_definitions(cur, table):
+    """Return [(name, definition)] for indexes on table that no constraint depends on"""
+    cur.execute("""
+        SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        JOIN pg_class t ON t.oid = ix.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        LEFT JOIN pg_constraint c ON c.conindid = ix.indexrelid
+        WHERE t.relname = %s
+          AND n.nspname = current_schema()
+          AND c.oid IS NULL
+        ORDER BY i.relname
+    """, (table,))
+    return cur.fetchall()
+
+def _if_not_exists(definition):
+    return re.sub(r'^CREATE (UNIQUE )?INDEX ', r'CREATE \1INDEX IF NOT EXISTS ', definition)
+
+def _build_index(connect, definition, maintenance_work_mem):
+    conn = connect()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+            cur.execute("SET max_parallel_maintenance_workers = 2")
+            cur.execute(_if_not_exists(definition))
+    finally:
+        conn.close()
+
+def rebuild_indexes(connect, table, definitions, workers=REBUILD_WORKERS,
+                    maintenance_work_mem=MAINTENANCE_WORK_MEM):
+    """Create the given indexes in parallel, one connection per worker, then ANALYZE"""
+    print(f"Rebuilding {len(definitions)} indexes on {table} with {workers} workers...")
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_build_index, connect, definition, maintenance_work_mem): name
+            for name, definition in definitions
+        }
+        for future, name in futures.items():
+            try:
+                future.result()
+                print(f"  Rebuilt {name}")
+            except Exception as e:
+                failures.append(name)
+                print(f"  Error rebuilding {name}: {e}")
+
+    conn = connect()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"ANALYZE {table}")
+    finally:
+        conn.close()
+
+    if failures:
+        raise RuntimeError(f"Failed to rebuild indexes: {', '.join(failures)}")
+    print("Indexes rebuilt and table analyzed")
+
+def connection_target(conn):
+    """The host, port and database name a connection points at"""
+    return {'host': conn.info.host, 'port': conn.info.port, 'dbname': conn.info.dbname}
+
+def _save_state(state_file, table, definitions, target):
+    os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+    with open(state_file, 'w') as f:
+        json.dump({'table': table, 'database': target, 'indexes': definitions}, f, indent=2)
+
+@contextmanager
+def deferred_indexes(conn, table='contracts', connect=get_connection, state_file=STATE_FILE,
+                     workers=REBUILD_WORKERS, maintenance_work_mem=MAINTENANCE_WORK_MEM):
+    """Drop secondary indexes on table for the duration of a bulk load
+
+    The indexes are rebuilt when the block exits, whether or not the load
+    succeeded; if the load failed, its error is the one re-raised.
+    `connect` opens the extra connections used for the parallel rebuild and
+    must point at the same database as `conn`.
+    """
+    if os.path.exists(state_file):
+        raise RuntimeError(
+            f"{state_file} exists: a previous full load did not restore its indexes. "
+            "Run index_maintenance.py --restore first."
+        )
+
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+        if cur.fetchone()[0]:
+            cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", (table,))
+            estimate = cur.fetchone()[0]
+            print(f"Warning: {table} already holds data (~{max(estimate, 0)} rows); "
+                  "its indexes will be dropped and rebuilt around this load")
+
+        definitions = [list(d) for d in secondary_index_definitions(cur, table)]
+        _save_state(state_file, table, definitions, connection_target(conn))
+
+        print(f"Dropping {len(definitions)} secondary indexes on {table} for the full load...")
+        for name, _ in definitions:
+            cur.execute(f'DROP INDEX IF EXISTS "{name}"')
+    conn.commit()
+
+    try:
+        yield definitions
+    except BaseException:
+        # Discard the transaction the failed load left open, and keep its error as the one
+        # reported: a rebuild failure here is only logged
+        conn.rollback()
+        try:
+            rebuild_indexes(connect, table, definitions, workers, maintenance_work_mem)
+            os.remove(state_file)
+        except Exception as e:
+            print(f"Error rebuilding indexes after the failed load: {e}")
+            print(f"Index definitions are kept in {state_file}; run index_maintenance.py --restore")
+        raise
+
+    conn.rollback()
+    try:
+        rebuild_indexes(connect, table, definitions, workers, maintenance_work_mem)
+    except Exception:
+        print(f"Index definitions are kept in {state_file}; run index_maintenance.py --restore")
+        raise
+    os.remove(state_file)
+
+def connect_to_target(target, db_url=None):
+    """Connector for the database a state file was recorded against
+
+    An explicit db_url wins; otherwise the local DB_* database is used when
+    it is the recorded one, and SUPABASE_DB_URL (get_connection) when not.
+    """
+    if db_url:
+        return lambda: get_connection(db_url)
+    local = {'host': DB_PARAMS['host'], 'port': DB_PARAMS['port'], 'dbname': DB_PARAMS['database']}
+    if target == local:
+        return lambda: psycopg2.connect(**DB_PARAMS)
+    return get_connection
+
+def restore_indexes(connect=None, state_file=STATE_FILE, workers=REBUILD_WORKERS,
+                    maintenance_work_mem=MAINTENANCE_WORK_MEM, db_url=None):
+    """Recreate indexes recorded by an interrupted full load, on the database they were dropped from"""
+    if not os.path.exists(state_file):
+        print("No deferred indexes to restore")
+        return
+    with open(state_file) as f:
+        state = json.load(f)
+
+    target = state.get('database')
+    if connect is None:
+        if target is None:
+            raise RuntimeError(f"{state_file} does not record its database; pass --db-url explicitly")
+        connect = connect_to_target(target, db_url)
+    if target is not None:
+        conn = connect()
+        try:
+            actual = connection_target(conn)
+        finally:
+            conn.close()
+        if actual != target:
+            raise RuntimeError(
+                f"Indexes in {state_file} were dropped on {target['dbname']} at "
+                f"{target['host']}:{target['port']}, not {actual['dbname']} at "
+                f"{actual['host']}:{actual['port']}; pass --db-url for that database"
+            )
+
+    print(f"Restoring indexes on {state['table']} in {(target or {}).get('dbname', 'the given database')}...")
+    rebuild_indexes(connect, state['table'], state['indexes'], workers, maintenance_work_mem)
+    os.remove(state_file)
+
+def main():
+    parser = argparse.ArgumentParser(description='Restore indexes left dropped by an interrupted full load')
+    parser.add_argument('--restore', action='store_true', help='Recreate indexes from the state file')
+    parser.add_argument('--state-file', default=STATE_FILE)
+    parser.add_argument('--workers', type=int, default=REBUILD_WORKERS)
+    parser.add_argument('--db-url', help='Database URL (defaults to the database recorded in the state file)')
+    args = parser.parse_args()
+
+    if not args.restore:
+        parser.print_help()
+        return
+
+    try:
+        restore_indexes(state_file=args.state_file, workers=args.workers, db_url=args.db_url)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
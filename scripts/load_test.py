@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Replay a weighted mix of dashboard queries against a running Next.js instance
+
+Each worker thread picks a scenario by weight, fills in its parameters
+(every list is a set of alternatives picked at random; a nested list is
+sent as a repeated parameter, e.g. state=CA&state=TX) and times the
+request. The report gives throughput, errors and p50/p95/p99 latency per scenario;
+latencies cover successful requests only.
+
+    python load_test.py --duration 60 --concurrency 16
+    python load_test.py --save-baseline ../data/load_baseline.json
+    python load_test.py --baseline ../data/load_baseline.json --tolerance 0.25
+
+With --baseline the run fails (exit 1) when a scenario's p95/p99 grows by
+more than the tolerance or its error rate rises; absolute limits can also be
+set per scenario with "thresholds" in a --config file:
+
+    {"scenarios": [{"name": "keyword", "path": "/api/contracts",
+                    "weight": 3, "params": {"keyword": ["software", "roofing"]}}],
+     "thresholds": {"keyword": {"p95_ms": 800, "error_rate": 0.01}}}
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+DEFAULT_BASE_URL = 'http://localhost:3000'
+
+KEYWORDS = ['software', 'construction', 'medical', 'cybersecurity', 'janitorial', 'training']
+STATES = ['CA', 'TX', 'VA', 'MD', 'FL', 'NY', 'WA', 'CO']
+AGENCIES = [
+    'DEPT OF DEFENSE',
+    'VETERANS AFFAIRS, DEPARTMENT OF',
+    'HOMELAND SECURITY, DEPARTMENT OF',
+    'HEALTH AND HUMAN SERVICES, DEPARTMENT OF',
+]
+NAICS_CODES = ['541511', '541512', '541330', '236220', '561720', '541519']
+# (lat, lng) of metro areas with dense contract activity
+LOCATIONS = [(38.9072, -77.0369), (32.7157, -117.1611), (29.4241, -98.4936), (47.6062, -122.3321)]
+
+DEFAULT_SCENARIOS = [
+    {'name': 'contracts_keyword', 'path': '/api/contracts', 'weight': 4,
+     'params': {'keyword': KEYWORDS}},
+    {'name': 'contracts_state', 'path': '/api/contracts', 'weight': 3,
+     'params': {'state': STATES, 'page': ['1', '2', '3']}},
+    {'name': 'contracts_agency', 'path': '/api/contracts', 'weight': 2,
+     'params': {'department_agency': AGENCIES}},
+    {'name': 'contracts_naics', 'path': '/api/contracts', 'weight': 2,
+     'params': {'naics_code': NAICS_CODES, 'state': STATES}},
+    {'name': 'contracts_deep_page', 'path': '/api/contracts', 'weight': 1,
+     'params': {'page': ['50', '100', '200', '400'], 'limit': ['25', '50']}},
+    {'name': 'contracts_radius', 'path': '/api/contracts', 'weight': 1,
+     'params': {'location': LOCATIONS, 'location_radius': ['25', '50', '100']}},
+    {'name': 'filters', 'path': '/api/contracts/filters', 'weight': 1, 'params': {}},
+    {'name': 'spend_geography', 'path': '/api/analytics/spend', 'weight': 2,
+     'params': {'groupBy': ['geography'], 'state': [[], ['CA', 'TX'], ['VA', 'MD', 'DC']]}},
+    {'name': 'spend_agency', 'path': '/api/analytics/spend', 'weight': 1,
+     'params': {'groupBy': ['agency'], 'naics': [[], ['541511'], ['236220', '541330']]}},
+    {'name': 'contractors', 'path': '/api/analytics/contractors', 'weight': 1,
+     'params': {'search': ['', 'lockheed', 'booz', 'services'], 'page': ['1', '2']}},
+]
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def build_query(params, rng, bust_cache=False):
+    """Pick one alternative per parameter and encode the query string"""
+    pairs = []
+    for name, alternatives in params.items():
+        value = rng.choice(alternatives) if isinstance(alternatives, list) else alternatives
+        if name == 'location':
+            lat, lng = value
+            pairs += [('location_lat', str(lat)), ('location_lng', str(lng))]
+        elif isinstance(value, list):
+            pairs += [(name, v) for v in value]
+        elif value != '':
+            pairs.append((name, value))
+    if bust_cache:
+        # An unknown parameter changes the cache key without changing the query
+        pairs.append(('_lt', f"{rng.getrandbits(48):x}"))
+    return urllib.parse.urlencode(pairs)
+
+class Recorder:
+    """Thread-safe per-scenario latency samples of successful requests, plus error counts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def add(self, name, elapsed, error=None):
+        with self.lock:
+            if error:
+                # A fast 500 or a 30s timeout says nothing about the route's latency
+                self.errors[name] += 1
+                self.error_samples.setdefault(name, error)
+            else:
+                self.latencies[name].append(elapsed)
+
+    def scenarios(self):
+        return sorted(set(self.latencies) | set(self.errors))
+
+def run_worker(worker_id, base_url, scenarios, deadline, max_requests, counter, recorder,
+               seed, timeout, bust_cache):
+    rng = random.Random(seed + worker_id)
+    weights = [s.get('weight', 1) for s in scenarios]
+    while time.monotonic() < deadline:
+        with counter['lock']:
+            if max_requests and counter['sent'] >= max_requests:
+                return
+            counter['sent'] += 1
+
+        scenario = rng.choices(scenarios, weights)[0]
+        query = build_query(scenario.get('params', {}), rng, bust_cache)
+        url = f"{base_url}{scenario['path']}" + (f"?{query}" if query else '')
+
+        error = None
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            error = f"HTTP {e.code} for {url}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        recorder.add(scenario['name'], time.perf_counter() - start, error)
+
+def summarize(recorder, elapsed):
+    """Per-scenario and overall throughput / latency stats (milliseconds)
+
+    Latency percentiles cover successful requests only; errors are counted
+    separately in errors / error_rate.
+    """
+    def stats(latencies, errors):
+        values = sorted(latencies)
+        requests = len(values) + errors
+        return {
+            'requests': requests,
+            'successes': len(values),
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 1) if values else None,
+            'p95_ms': round(percentile(values, 95) * 1000, 1) if values else None,
+            'p99_ms': round(percentile(values, 99) * 1000, 1) if values else None,
+        }
+
+    summary = {
+        name: stats(recorder.latencies[name], recorder.errors[name])
+        for name in recorder.scenarios()
+    }
+    all_latencies = [v for latencies in recorder.latencies.values() for v in latencies]
+    summary['_total'] = stats(all_latencies, sum(recorder.errors.values()))
+    return summary
+
+def print_report(summary, elapsed):
+    print(f"\nCompleted in {elapsed:.1f}s")
+    print(f"{'scenario':<22}{'reqs':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, s in summary.items():
+        fmt = lambda v: '-' if v is None else f"{v:.1f}"
+        print(f"{name:<22}{s['requests']:>7}{s['errors']:>8}{s['throughput_rps']:>9.1f}"
+              f"{fmt(s['p50_ms']):>10}{fmt(s['p95_ms']):>10}{fmt(s['p99_ms']):>10}")
+
+def check_regressions(summary, baseline=None, tolerance=0.2, thresholds=None, min_requests=20):
+    """Return a list of failure messages; empty when the run is within limits"""
+    failures = []
+
+    for name, limits in (thresholds or {}).items():
+        s = summary.get(name)
+        if not s:
+            failures.append(f"{name}: no requests recorded")
+            continue
+        for metric, limit in limits.items():
+            value = s.get(metric)
+            if value is not None and value > limit:
+                failures.append(f"{name}: {metric} {value} exceeds limit {limit}")
+
+    for name, base in (baseline or {}).items():
+        s = summary.get(name)
+        if not s or s['requests'] < min_requests or base.get('requests', 0) < min_requests:
+            continue
+        # Percentiles need enough successful samples on both sides to compare; baselines
+        # saved before successes was recorded fall back to their request count
+        if s['successes'] >= min_requests and base.get('successes', base['requests']) >= min_requests:
+            for metric in ('p95_ms', 'p99_ms'):
+                if base.get(metric) and s[metric] is not None and s[metric] > base[metric] * (1 + tolerance):
+                    failures.append(f"{name}: {metric} {s[metric]} regressed from baseline {base[metric]} "
+                                    f"(tolerance {tolerance:.0%})")
+        if s['error_rate'] > base.get('error_rate', 0) + 0.01:
+            failures.append(f"{name}: error_rate {s['error_rate']} up from baseline {base.get('error_rate', 0)}")
+
+    return failures
+
+def load_config(path):
+    if not path:
+        return DEFAULT_SCENARIOS, {}
+    with open(path) as f:
+        config = json.load(f)
+    return config.get('scenarios', DEFAULT_SCENARIOS), config.get('thresholds', {})
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the API routes with a replayable query mix')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--config', help='JSON file with "scenarios" and/or "thresholds"')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (default 30)')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=float, default=0, help='Seconds of unrecorded warm-up traffic')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed, so runs replay the same mix')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--bust-cache', action='store_true',
+                        help='Add a random parameter so every request misses the API result cache')
+    parser.add_argument('--output', help='Write the summary JSON here')
+    parser.add_argument('--baseline', help='Summary JSON of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed p95/p99 growth over the baseline (default 0.2 = 20%%)')
+    parser.add_argument('--save-baseline', help='Write this run\'s summary as the new baseline')
+    args = parser.parse_args()
+
+    scenarios, thresholds = load_config(args.config)
+    base_url = args.base_url.rstrip('/')
+
+    def run(seconds, max_requests, seed):
+        recorder = Recorder()
+        counter = {'lock': threading.Lock(), 'sent': 0}
+        deadline = time.monotonic() + seconds
+        threads = [
+            threading.Thread(target=run_worker, args=(
+                i, base_url, scenarios, deadline, max_requests, counter, recorder,
+                seed, args.timeout, args.bust_cache,
+            ), daemon=True)
+            for i in range(args.concurrency)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return recorder, time.perf_counter() - start
+
+    if args.warmup:
+        print(f"Warming up for {args.warmup:.0f}s...")
+        run(args.warmup, 0, args.seed + 10000)
+
+    duration = args.duration if not args.requests else float('inf')
+    print(f"Replaying {len(scenarios)} scenarios against {base_url} "
+          f"with {args.concurrency} workers...")
+    recorder, elapsed = run(duration, args.requests, args.seed)
+
+    summary = summarize(recorder, elapsed)
+    print_report(summary, elapsed)
+    for name, error in recorder.error_samples.items():
+        print(f"  first error in {name}: {error}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(summary, f, indent=2)
+            print(f"Summary written to {path}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failures = check_regressions(summary, baseline, args.tolerance, thresholds)
+    if failures:
+        print("\nThreshold regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    if baseline or thresholds:
+        print("\nAll scenarios within thresholds")
+
+if __name__ == "__main__":
+    main()
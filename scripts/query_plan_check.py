@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression checks for the API's hot queries
+
+Builds the schema (the Supabase migrations or the local init.sql +
+update_schema.sql) in a scratch schema, loads a synthetic, seeded dataset
+of configurable size and runs the SQL equivalent of each route's query with
+EXPLAIN (ANALYZE, BUFFERS). For every query it records the plan shape
+(node types with the relations and indexes they touch), buffers touched
+and timing.
+
+    python query_plan_check.py --rows 200000 --save-baseline ../data/plan_baseline.json
+    python query_plan_check.py --rows 200000 --baseline ../data/plan_baseline.json
+
+Against a baseline the run fails (exit 1) when a relation that was read
+through an index is now read by a sequential scan, or when a query touches
+more buffers than its budget. Budgets are written into the baseline as
+buffers * (1 + --buffer-tolerance) and can be edited by hand.
+
+The run creates and drops a schema, installs functions and triggers, loads
+the synthetic rows and vacuums, so it connects to the local docker-compose
+database unless --db-url names another one; SUPABASE_DB_URL is ignored.
+"""
+import os
+import sys
+import json
+import math
+import argparse
+import psycopg2
+
+from db_utils import DB_PARAMS
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SCHEMA_FILES = {
+    'supabase': sorted(
+        os.path.join(ROOT, 'supabase', 'migrations', name)
+        for name in os.listdir(os.path.join(ROOT, 'supabase', 'migrations'))
+        if name.endswith('.sql')
+    ),
+    'local': [
+        os.path.join(ROOT, 'scripts', 'init.sql'),
+        os.path.join(ROOT, 'scripts', 'update_schema.sql'),
+    ],
+}
+
+SCRATCH_SCHEMA = 'plan_check'
+
+AGENCIES = [
+    'DEPT OF DEFENSE', 'VETERANS AFFAIRS, DEPARTMENT OF', 'HOMELAND SECURITY, DEPARTMENT OF',
+    'HEALTH AND HUMAN SERVICES, DEPARTMENT OF', 'INTERIOR, DEPARTMENT OF THE',
+    'AGRICULTURE, DEPARTMENT OF', 'ENERGY, DEPARTMENT OF', 'GENERAL SERVICES ADMINISTRATION',
+    'TRANSPORTATION, DEPARTMENT OF', 'JUSTICE, DEPARTMENT OF',
+]
+SUB_TIERS = [
+    'DEPT OF THE ARMY', 'DEPT OF THE NAVY', 'DEPT OF THE AIR FORCE', 'DEFENSE LOGISTICS AGENCY',
+    'VETERANS AFFAIRS, DEPARTMENT OF', 'U.S. COAST GUARD', 'NATIONAL INSTITUTES OF HEALTH',
+    'NATIONAL PARK SERVICE', 'FOREST SERVICE', 'PUBLIC BUILDINGS SERVICE',
+]
+NAICS_CODES = [
+    '541511', '541512', '541519', '541330', '541380', '236220', '237310', '238210',
+    '561720', '561210', '562111', '339112', '334511', '336411', '611430', '621111',
+]
+STATES = ['CA', 'TX', 'VA', 'MD', 'FL', 'NY', 'WA', 'CO', 'DC', 'GA', 'NC', 'OH', 'AZ', 'PA', 'IL', 'AK']
+CITIES = [
+    'San Diego', 'San Antonio', 'San Francisco', 'Santa Fe', 'Sacramento', 'Seattle', 'Norfolk',
+    'Washington', 'Arlington', 'Austin', 'Denver', 'Atlanta', 'Baltimore', 'Tampa', 'Dayton',
+    'Huntsville', 'Anchorage', 'Phoenix', 'Chicago', 'Philadelphia',
+]
+TYPES = ['Solicitation', 'Presolicitation', 'Award Notice', 'Combined Synopsis/Solicitation', 'Sources Sought']
+SET_ASIDES = ['SBA', '8A', 'SDVOSBC', 'WOSB', None]
+WORDS = [
+    'software', 'construction', 'medical', 'cybersecurity', 'janitorial', 'training', 'repair',
+    'roofing', 'maintenance', 'equipment', 'support', 'engineering', 'laboratory', 'vehicle',
+    'hvac', 'network', 'consulting', 'fuel', 'paving', 'dredging',
+]
+AWARDEES = ['ACME', 'LOCKHEED MARTIN', 'BOOZ ALLEN HAMILTON', 'LEIDOS', 'SAIC', 'JACOBS', 'FEDSERV', 'TRIDENT']
+
+# Distribution knobs: power > 1 skews picks towards the start of a list
+GENERATE_SQL = """
+    INSERT INTO contracts (
+        notice_id, title, description, department_agency, sub_tier, office, type, set_aside,
+        naics_code, state, city, posted_date, response_deadline, award_amount, awardee
+    )
+    SELECT
+        'SYN-' || g,
+        initcap(v.words[1 + floor(random() * cardinality(v.words))::int]) || ' '
+            || v.words[1 + floor(random() * cardinality(v.words))::int] || ' services',
+        'Requirement for ' || v.words[1 + floor(random() * cardinality(v.words))::int]
+            || ' and ' || v.words[1 + floor(random() * cardinality(v.words))::int]
+            || ' work, lot ' || g,
+        v.agencies[1 + floor(power(random(), 2) * cardinality(v.agencies))::int],
+        v.sub_tiers[1 + floor(power(random(), 2) * cardinality(v.sub_tiers))::int],
+        'OFFICE ' || floor(power(random(), 3) * 2000)::int,
+        v.types[1 + floor(random() * cardinality(v.types))::int],
+        v.set_asides[1 + floor(random() * cardinality(v.set_asides))::int],
+        v.naics[1 + floor(power(random(), 2) * cardinality(v.naics))::int],
+        v.states[1 + floor(power(random(), 1.5) * cardinality(v.states))::int],
+        v.cities[1 + floor(random() * cardinality(v.cities))::int],
+        CASE WHEN random() < 0.05 THEN NULL
+             ELSE date '2018-01-01' + floor(random() * 2500)::int END,
+        CASE WHEN random() < 0.3 THEN NULL
+             ELSE timestamp '2018-02-01' + random() * interval '2500 days' END,
+        CASE WHEN random() < 0.6 THEN NULL
+             ELSE round((power(random(), 3) * 5000000)::numeric, 2) END,
+        v.awardees[1 + floor(random() * cardinality(v.awardees))::int] || ' ' || floor(power(random(), 2) * 3000)::int
+    FROM generate_series(1, %(rows)s) AS g,
+         (SELECT %(words)s::text[] AS words, %(agencies)s::text[] AS agencies,
+                 %(sub_tiers)s::text[] AS sub_tiers, %(types)s::text[] AS types,
+                 %(set_asides)s::text[] AS set_asides, %(naics)s::text[] AS naics,
+                 %(states)s::text[] AS states, %(cities)s::text[] AS cities,
+                 %(awardees)s::text[] AS awardees) AS v
+"""
+
+KEYWORD_OR = (
+    "title ILIKE %(kw)s OR description ILIKE %(kw)s OR department_agency ILIKE %(kw)s "
+    "OR sub_tier ILIKE %(kw)s OR office ILIKE %(kw)s"
+)
+PAGE = "ORDER BY posted_date DESC NULLS LAST LIMIT 25 OFFSET %(offset)s"
+
+# SQL equivalents of the PostgREST queries the API routes build
+QUERIES = {
+    'contracts_default': (
+        f"SELECT * FROM contracts {PAGE}",
+        {'offset': 0}),
+    'contracts_deep_page': (
+        f"SELECT * FROM contracts {PAGE}",
+        {'offset': 5000}),
+    'contracts_keyword': (
+        f"SELECT * FROM contracts WHERE {KEYWORD_OR} {PAGE}",
+        {'kw': '%cybersecurity%', 'offset': 0}),
+    'contracts_keyword_count': (
+        f"SELECT count(*) FROM contracts WHERE {KEYWORD_OR}",
+        {'kw': '%cybersecurity%'}),
+    'contracts_state': (
+        f"SELECT * FROM contracts WHERE state = %(state)s {PAGE}",
+        {'state': 'AK', 'offset': 0}),
+    'contracts_agency': (
+        f"SELECT * FROM contracts WHERE department_agency = %(agency)s {PAGE}",
+        {'agency': 'JUSTICE, DEPARTMENT OF', 'offset': 0}),
+    'contracts_naics': (
+        f"SELECT * FROM contracts WHERE naics_code = %(naics)s {PAGE}",
+        {'naics': '621111', 'offset': 0}),
+    'contracts_city_prefix': (
+        f"SELECT * FROM contracts WHERE city ILIKE %(city)s {PAGE}",
+        {'city': 'Anch%', 'offset': 0}),
+    'contracts_posted_range': (
+        "SELECT * FROM contracts WHERE posted_date >= %(start)s AND posted_date <= %(end)s "
+        + PAGE,
+        {'start': '2024-06-01', 'end': '2024-06-30', 'offset': 0}),
+    'spend_geography': (
+        "SELECT state, posted_date, award_amount FROM contracts "
+        "WHERE award_amount IS NOT NULL AND award_amount > 0 "
+        "AND state IS NOT NULL AND state <> '' AND state IN %(states)s",
+        {'states': ('AK', 'AZ')}),
+    'spend_naics_prefix': (
+        "SELECT naics_code, posted_date, award_amount FROM contracts "
+        "WHERE award_amount IS NOT NULL AND award_amount > 0 "
+        "AND naics_code IS NOT NULL AND naics_code <> '' "
+        "AND (naics_code LIKE %(p1)s OR naics_code LIKE %(p2)s)",
+        {'p1': '6211%', 'p2': '6114%'}),
+    'contractors_search': (
+        "SELECT awardee, state, city, award_amount, posted_date FROM contracts "
+        "WHERE awardee IS NOT NULL AND awardee <> '' "
+        "AND award_amount IS NOT NULL AND award_amount > 0 AND awardee ILIKE %(search)s",
+        {'search': '%trident 12%'}),
+}
+
+INDEX_SCANS = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan', 'Bitmap Heap Scan'}
+
+def build_scratch_schema(conn, schema, schema_files, rows, seed):
+    """(Re)create the scratch schema, apply the schema files and load synthetic rows"""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path = {schema}")
+        for path in schema_files:
+            print(f"  Applying {os.path.relpath(path, ROOT)}")
+            with open(path) as f:
+                cur.execute(f.read())
+
+        cur.execute("""
+            INSERT INTO naics_codes (code, title)
+            SELECT code, 'Synthetic NAICS ' || code FROM unnest(%s::text[]) AS code
+            ON CONFLICT (code) DO NOTHING
+        """, (NAICS_CODES,))
+        cur.execute("""
+            INSERT INTO states (code, name)
+            SELECT code, code FROM unnest(%s::text[]) AS code
+            ON CONFLICT (code) DO NOTHING
+        """, (STATES,))
+
+        print(f"  Generating {rows:,} synthetic contracts...")
+        cur.execute("SELECT setseed(%s)", (seed,))
+        cur.execute(GENERATE_SQL, {
+            'rows': rows, 'words': WORDS, 'agencies': AGENCIES, 'sub_tiers': SUB_TIERS,
+            'types': TYPES, 'set_asides': SET_ASIDES, 'naics': NAICS_CODES, 'states': STATES,
+            'cities': CITIES, 'awardees': AWARDEES,
+        })
+    conn.commit()
+
+    # VACUUM sets the visibility map so index-only scans are costed as they would be in production
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path = {schema}")
+        cur.execute("SELECT relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                    "WHERE n.nspname = %s AND c.relkind = 'r'", (schema,))
+        for (table,) in cur.fetchall():
+            cur.execute(f"VACUUM ANALYZE {schema}.{table}")
+    conn.autocommit = False
+
+def plan_nodes(plan, nodes=None):
+    """Flatten an EXPLAIN JSON plan tree into (node type, relation, index) tuples"""
+    if nodes is None:
+        nodes = []
+    nodes.append((plan['Node Type'], plan.get('Relation Name'), plan.get('Index Name')))
+    for child in plan.get('Plans', []):
+        plan_nodes(child, nodes)
+    return nodes
+
+def relation_access(nodes):
+    """Map each scanned relation to 'index' or 'seq' (index wins if it is read both ways)"""
+    # Bitmap Index Scans name only the index; the Bitmap Heap Scan above them names the relation
+    access = {}
+    for node_type, relation, _ in nodes:
+        if not relation:
+            continue
+        if node_type in INDEX_SCANS:
+            access[relation] = 'index'
+        elif node_type == 'Seq Scan':
+            access.setdefault(relation, 'seq')
+    return access
+
+def explain(cur, sql, params):
+    """Run EXPLAIN (ANALYZE, BUFFERS) twice and summarize the warm run"""
+    statement = f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"
+    cur.execute(statement, params)
+    cur.execute(statement, params)
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    top = result[0]
+    plan = top['Plan']
+    nodes = plan_nodes(plan)
+    return {
+        'shape': [' '.join(filter(None, [t, r and f"on {r}", i and f"using {i}"])) for t, r, i in nodes],
+        'access': relation_access(nodes),
+        'buffers': plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0),
+        'rows': plan.get('Actual Rows'),
+        'planning_ms': round(top.get('Planning Time', 0), 3),
+        'execution_ms': round(top.get('Execution Time', 0), 3),
+    }
+
+def run_queries(conn, schema, queries):
+    results = {}
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path = {schema}")
+        for name, (sql, params) in queries.items():
+            results[name] = explain(cur, sql, params)
+    conn.rollback()
+    return results
+
+def compare(results, baseline, time_tolerance=None):
+    """Return (failures, warnings) comparing this run's plans with a baseline"""
+    failures, warnings = [], []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            warnings.append(f"{name}: in the baseline but not run")
+            continue
+
+        for relation, access in base['access'].items():
+            if access == 'index' and current['access'].get(relation) == 'seq':
+                failures.append(f"{name}: {relation} went from an index scan to a sequential scan")
+
+        budget = base.get('buffer_budget')
+        if budget is not None and current['buffers'] > budget:
+            failures.append(f"{name}: {current['buffers']} buffers exceeds budget {budget} "
+                            f"(baseline {base['buffers']})")
+
+        if current['shape'] != base['shape']:
+            warnings.append(f"{name}: plan shape changed\n      was: {' > '.join(base['shape'])}"
+                            f"\n      now: {' > '.join(current['shape'])}")
+
+        if time_tolerance is not None and base['execution_ms'] and \
+                current['execution_ms'] > base['execution_ms'] * (1 + time_tolerance):
+            failures.append(f"{name}: execution {current['execution_ms']}ms over baseline "
+                            f"{base['execution_ms']}ms (tolerance {time_tolerance:.0%})")
+    return failures, warnings
+
+def print_report(results):
+    print(f"\n{'query':<26}{'access':<34}{'buffers':>9}{'rows':>8}{'exec ms':>10}")
+    for name, r in results.items():
+        access = ', '.join(f"{rel}:{a}" for rel, a in sorted(r['access'].items()))
+        print(f"{name:<26}{access[:33]:<34}{r['buffers']:>9}{r['rows'] or 0:>8}{r['execution_ms']:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the hot API queries for plan regressions')
+    parser.add_argument('--db-url', help='Scratch database URL (defaults to the local docker-compose database, never SUPABASE_DB_URL)')
+    parser.add_argument('--schema-source', choices=sorted(SCHEMA_FILES), default='supabase',
+                        help='Schema to build: the Supabase migrations or the local init.sql (default supabase)')
+    parser.add_argument('--scratch-schema', default=SCRATCH_SCHEMA,
+                        help=f'Schema the synthetic data is built in (default {SCRATCH_SCHEMA}); it is dropped and recreated')
+    parser.add_argument('--rows', type=int, default=200000, help='Synthetic contracts to generate')
+    parser.add_argument('--seed', type=float, default=0.42, help='setseed() value for the generator')
+    parser.add_argument('--reuse', action='store_true', help='Query an existing scratch schema without rebuilding it')
+    parser.add_argument('--keep', action='store_true', help='Leave the scratch schema in place afterwards')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', help='Write this run as the new baseline')
+    parser.add_argument('--buffer-tolerance', type=float, default=0.5,
+                        help='Headroom over measured buffers when saving budgets (default 0.5 = 50%%)')
+    parser.add_argument('--time-tolerance', type=float,
+                        help='Also fail when execution time grows past this fraction of the baseline')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.db_url) if args.db_url else psycopg2.connect(**DB_PARAMS)
+    try:
+        if not args.reuse:
+            print(f"Building scratch schema {args.scratch_schema} from the {args.schema_source} schema...")
+            build_scratch_schema(conn, args.scratch_schema, SCHEMA_FILES[args.schema_source],
+                                 args.rows, args.seed)
+
+        results = run_queries(conn, args.scratch_schema, QUERIES)
+        print_report(results)
+
+        if args.save_baseline:
+            baseline = {
+                'meta': {'rows': args.rows, 'seed': args.seed, 'schema_source': args.schema_source},
+                'queries': {
+                    name: dict(r, buffer_budget=math.ceil(r['buffers'] * (1 + args.buffer_tolerance)))
+                    for name, r in results.items()
+                },
+            }
+            with open(args.save_baseline, 'w') as f:
+                json.dump(baseline, f, indent=2)
+            print(f"\nBaseline written to {args.save_baseline}")
+
+        failures = []
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            dataset = {'rows': args.rows, 'seed': args.seed, 'schema_source': args.schema_source}
+            if not args.reuse and baseline['meta'] != dataset:
+                print(f"\nWarning: baseline was recorded with {baseline['meta']}; "
+                      "buffer budgets assume the same dataset")
+            failures, warnings = compare(results, baseline['queries'], args.time_tolerance)
+            for warning in warnings:
+                print(f"  note: {warning}")
+            if not failures:
+                print("\nNo plan regressions against the baseline")
+    finally:
+        if not args.keep and not args.reuse:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {args.scratch_schema} CASCADE")
+            conn.commit()
+        conn.close()
+
+    if failures:
+        print("\nPlan regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Re-cluster older contracts in posted_date order
+
+New loads are written in date order, but rows loaded before that (or
+updated since) sit wherever they landed, which widens the block ranges of
+the posted_date BRIN index. This rewrites the rows posted before a cutoff
+one month at a time, oldest first: each month is deleted and re-inserted
+in date order in a single statement, so it lands as one contiguous,
+sorted run of pages. Readers are not blocked and row ids are kept. The
+table is then vacuumed and its BRIN indexes are rebuilt concurrently.
+
+    python recluster_contracts.py --before 2024-01-01
+    python recluster_contracts.py --full      # CLUSTER the whole table (exclusive lock)
+
+The median number of days one BRIN block range covers is printed before
+and after; the smaller it is, the fewer blocks a date-range scan reads.
+"""
+import sys
+import argparse
+from contextlib import contextmanager
+from datetime import date
+
+from db_utils import get_connection
+from dimensions import facts_table
+
+MOVE_MONTH_SQL = """
+    WITH moved AS (
+        DELETE FROM {table}
+        WHERE posted_date >= %s AND posted_date < %s
+        RETURNING *
+    )
+    INSERT INTO {table} SELECT * FROM moved ORDER BY posted_date, id
+"""
+
+# pages_per_range of the BRIN indexes in supabase/migrations/006 and update_schema.sql
+PAGES_PER_RANGE = 32
+
+def median_range_span(cur, table, pages_per_range=PAGES_PER_RANGE):
+    """Median days of posted_date covered by one BRIN block range (one full scan)"""
+    cur.execute(f"""
+        SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY span)
+        FROM (
+            SELECT EXTRACT(EPOCH FROM MAX(posted_date)::timestamp - MIN(posted_date)::timestamp) / 86400 AS span
+            FROM {table}
+            WHERE posted_date IS NOT NULL
+            GROUP BY (ctid::text::point)[0]::bigint / %s
+        ) ranges
+    """, (pages_per_range,))
+    span = cur.fetchone()[0]
+    return None if span is None else round(span, 1)
+
+def table_indexes(cur, table, method):
+    """Names of the indexes of the given access method (brin, btree) on table"""
+    cur.execute("""
+        SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        JOIN pg_am am ON am.oid = i.relam
+        WHERE ix.indrelid = %s::regclass AND am.amname = %s
+        ORDER BY i.relname
+    """, (table, method))
+    return cur.fetchall()
+
+def month_starts(first, before):
+    month = date(first.year, first.month, 1)
+    while month < before:
+        yield month
+        month = date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+@contextmanager
+def autovacuum_paused(conn, table):
+    """Keep autovacuum from freeing space mid-run, so re-inserted months append instead of filling holes"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT reloptions FROM pg_class WHERE oid = %s::regclass", (table,))
+        options = [o for o in (cur.fetchone()[0] or []) if o.startswith('autovacuum_enabled=')]
+        cur.execute(f"ALTER TABLE {table} SET (autovacuum_enabled = false)")
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            if options:
+                cur.execute(f"ALTER TABLE {table} SET ({options[0]})")
+            else:
+                cur.execute(f"ALTER TABLE {table} RESET (autovacuum_enabled)")
+        conn.commit()
+
+def recluster_before(conn, table, before):
+    """Rewrite rows posted before `before` in date order, one committed month at a time"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT MIN(posted_date) FROM {table} WHERE posted_date < %s", (before,))
+        first = cur.fetchone()[0]
+    if first is None:
+        print(f"No rows posted before {before}")
+        return 0
+
+    moved = 0
+    months = list(month_starts(first, before))
+    for start, end in zip(months, months[1:] + [None]):
+        end = min(end or before, before)
+        with conn.cursor() as cur:
+            cur.execute(MOVE_MONTH_SQL.format(table=table), (start, end))
+            count = cur.rowcount
+        conn.commit()
+        moved += count
+        if count:
+            print(f"  {start:%Y-%m}: {count:,} rows")
+    return moved
+
+def cluster_full(conn, table):
+    """CLUSTER the whole table on its posted_date B-tree (takes an ACCESS EXCLUSIVE lock)"""
+    with conn.cursor() as cur:
+        # Prefer an ascending index so the clustered data lines up with new loads
+        btrees = sorted(
+            (definition.endswith('(posted_date DESC)'), name)
+            for name, definition in table_indexes(cur, table, 'btree')
+            if definition.endswith('(posted_date)') or definition.endswith('(posted_date DESC)')
+        )
+        btrees = [name for _, name in btrees]
+        if not btrees:
+            raise RuntimeError(f"No B-tree index on {table}(posted_date) to cluster on")
+        print(f"Clustering {table} using {btrees[0]}...")
+        cur.execute(f'CLUSTER {table} USING "{btrees[0]}"')
+    conn.commit()
+
+def refresh_after_rewrite(conn, table, vacuum=True):
+    """VACUUM ANALYZE and rebuild the BRIN indexes, whose old ranges only ever widen"""
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            if vacuum:
+                print(f"Vacuuming {table}...")
+                cur.execute(f"VACUUM (ANALYZE) {table}")
+            else:
+                cur.execute(f"ANALYZE {table}")
+            for name, _ in table_indexes(cur, table, 'brin'):
+                print(f"Rebuilding {name}...")
+                cur.execute(f'REINDEX INDEX CONCURRENTLY "{name}"')
+    finally:
+        conn.autocommit = False
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-cluster contracts in posted_date order for the BRIN indexes')
+    parser.add_argument('--before', type=date.fromisoformat,
+                        help='Re-cluster rows posted before this date (default: January 1 of last year)')
+    parser.add_argument('--full', action='store_true',
+                        help='CLUSTER the whole table instead; blocks reads and writes while it runs')
+    parser.add_argument('--db-url', help='Database URL (defaults to SUPABASE_DB_URL or the local database)')
+    args = parser.parse_args()
+
+    before = args.before or date(date.today().year - 1, 1, 1)
+
+    conn = get_connection(args.db_url)
+    try:
+        with conn.cursor() as cur:
+            table = facts_table(cur)
+            print(f"Median days per block range before: {median_range_span(cur, table)}")
+        conn.commit()
+
+        if args.full:
+            cluster_full(conn, table)
+            refresh_after_rewrite(conn, table, vacuum=False)
+        else:
+            print(f"Re-clustering {table} rows posted before {before}...")
+            with autovacuum_paused(conn, table):
+                moved = recluster_before(conn, table, before)
+            print(f"Rewrote {moved:,} rows")
+            refresh_after_rewrite(conn, table)
+
+        with conn.cursor() as cur:
+            print(f"Median days per block range after: {median_range_span(cur, table)}")
+        conn.rollback()
+    except Exception as e:
+        print(f"Error re-clustering contracts: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Resolve awardee name variants to stable integer awardee_ids
+
+Names are normalized (case, punctuation, legal suffixes), then near-duplicate
+normalized names are clustered. Candidate pairs only come from a blocking
+index keyed on the leading name tokens, so the comparison work stays close to
+linear in the number of distinct names instead of comparing every pair.
+
+Results are written to the awardees / awardee_aliases tables and to
+contracts.awardee_id. Existing ids are kept across runs.
+"""
+import os
+import re
+import csv
+import sys
+import argparse
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from psycopg2.extras import execute_values
+
+from db_utils import get_connection
+from dataset_epoch import record_epoch
+from dimensions import facts_table
+
+DEFAULT_REPORT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'awardee_clusters.csv'
+)
+
+# Trailing tokens dropped from normalized names
+LEGAL_SUFFIXES = {
+    'INC', 'INCORPORATED', 'CORP', 'CORPORATION', 'CO', 'COMPANY', 'COMPANIES',
+    'LLC', 'LLP', 'LP', 'LTD', 'LIMITED', 'PLLC', 'PC', 'PLC', 'PA', 'GMBH', 'SA', 'AG',
+}
+
+SIMILARITY_THRESHOLD = 0.92
+MAX_BLOCK_SIZE = 500
+# Names compared with each neighbour within this distance (sorted order) in blocks
+# that cannot be split below MAX_BLOCK_SIZE
+NEIGHBOUR_WINDOW = 50
+
+NUMBER = re.compile(r'\d+')
+
+def normalize_name(name):
+    """Normalize an awardee name for matching, e.g. 'Lockheed Martin Corp.' -> 'LOCKHEED MARTIN'"""
+    if not name:
+        return ''
+    name = name.upper().replace('&', ' AND ')
+    # Join dotted abbreviations (L.L.C. -> LLC) before stripping punctuation
+    name = re.sub(r'\b([A-Z])\.(?=[A-Z]\.)', r'\1', name)
+    name = re.sub(r'[^A-Z0-9 ]+', ' ', name)
+    tokens = name.split()
+    if tokens and tokens[0] == 'THE':
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+def blocking_keys(normalized):
+    """Blocking index keys: the first token, and the first two tokens for common leading words"""
+    tokens = normalized.split()
+    if not tokens:
+        return []
+    keys = [tokens[0]]
+    if len(tokens) > 1:
+        keys.append(f"{tokens[0]} {tokens[1][:4]}")
+    return keys
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+def similar(a, b):
+    # 'SMITH CONSTRUCTION 1' and 'SMITH CONSTRUCTION 2' are different entities
+    if NUMBER.findall(a) != NUMBER.findall(b):
+        return False
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return (matcher.real_quick_ratio() >= SIMILARITY_THRESHOLD
+            and matcher.quick_ratio() >= SIMILARITY_THRESHOLD
+            and matcher.ratio() >= SIMILARITY_THRESHOLD)
+
+def split_block(members, depth):
+    """Split an oversized block on the next name token (first four characters), like
+    blocking_keys does for the first two. Returns (blocks, oversized) where oversized
+    blocks could not be split below MAX_BLOCK_SIZE."""
+    if len(members) <= MAX_BLOCK_SIZE:
+        return [members], []
+    parts = defaultdict(list)
+    for name in members:
+        tokens = name.split()
+        parts[tokens[depth][:4] if depth < len(tokens) else None].append(name)
+    if list(parts) == [None]:
+        return [], [members]
+
+    blocks, oversized = [], []
+    for token, part in parts.items():
+        if token is None:
+            # Names that end here share all their tokens' prefixes; nothing left to split on
+            (blocks if len(part) <= MAX_BLOCK_SIZE else oversized).append(part)
+        else:
+            part_blocks, part_oversized = split_block(part, depth + 1)
+            blocks.extend(part_blocks)
+            oversized.extend(part_oversized)
+    return blocks, oversized
+
+def cluster_names(normalized_names):
+    """Group normalized names into clusters of near-duplicates"""
+    blocks = defaultdict(list)
+    for name in normalized_names:
+        for key in blocking_keys(name):
+            blocks[key].append(name)
+
+    uf = UnionFind()
+    for name in normalized_names:
+        uf.find(name)
+
+    compared = set()
+
+    def compare(a, b):
+        if (a, b) in compared:
+            return
+        compared.add((a, b))
+        if similar(a, b):
+            uf.union(a, b)
+
+    # Prefer the narrowest block that is small enough to compare exhaustively;
+    # oversized first-token blocks are covered by their two-token blocks
+    oversized = []
+    for key, members in blocks.items():
+        if len(members) > MAX_BLOCK_SIZE and ' ' not in key:
+            continue
+        key_blocks, key_oversized = split_block(sorted(members), depth=2)
+        oversized.extend(key_oversized)
+        for members in key_blocks:
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    compare(a, b)
+
+    if oversized:
+        print(f"  {sum(len(m) for m in oversized)} names in {len(oversized)} blocks too large to compare "
+              f"exhaustively; comparing each with its {NEIGHBOUR_WINDOW} nearest names in sorted order")
+    for members in oversized:
+        for i, a in enumerate(members):
+            for b in members[i + 1:i + 1 + NEIGHBOUR_WINDOW]:
+                compare(a, b)
+
+    clusters = defaultdict(list)
+    for name in normalized_names:
+        clusters[uf.find(name)].append(name)
+    return list(clusters.values())
+
+def resolve_awardees(conn, report_path=DEFAULT_REPORT):
+    """Assign awardee_ids to every distinct awardee name and update contracts"""
+    print("Resolving awardee entities...")
+    cur = conn.cursor()
+    table = facts_table(cur)
+
+    cur.execute("""
+        SELECT awardee, COUNT(*)
+        FROM contracts
+        WHERE awardee IS NOT NULL AND TRIM(awardee) <> ''
+        GROUP BY awardee
+    """)
+    raw_counts = dict(cur.fetchall())
+
+    variants = defaultdict(list)
+    for raw in raw_counts:
+        normalized = normalize_name(raw)
+        if normalized:
+            variants[normalized].append(raw)
+
+    clusters = cluster_names(list(variants))
+
+    cur.execute("SELECT raw_name, awardee_id, normalized_name FROM awardee_aliases")
+    existing_aliases = {raw: (awardee_id, name) for raw, awardee_id, name in cur.fetchall()}
+    cur.execute("SELECT awardee_id, canonical_name FROM awardees")
+    existing_canonical = dict(cur.fetchall())
+
+    # Decide every cluster's id first, then write in a few batched statements;
+    # one statement per cluster is a round trip each against a remote database
+    resolved = []
+    renamed = []
+    merged = {}
+    new_clusters = []
+    for cluster in clusters:
+        raws = [raw for name in cluster for raw in variants[name]]
+        canonical = max(raws, key=lambda raw: (raw_counts[raw], raw))
+
+        ids = sorted({existing_aliases[raw][0] for raw in raws if raw in existing_aliases})
+        if ids:
+            awardee_id = ids[0]
+            if existing_canonical.get(awardee_id) != canonical:
+                renamed.append((awardee_id, canonical))
+            # Clusters that now span several old ids collapse onto the oldest one
+            for merged_id in ids[1:]:
+                merged.setdefault(merged_id, awardee_id)
+        else:
+            awardee_id = None
+            new_clusters.append((canonical, normalize_name(canonical)))
+        resolved.append((cluster, raws, canonical, awardee_id))
+
+    # An old id that is still another cluster's primary id is kept, not merged away
+    kept_ids = {awardee_id for *_, awardee_id in resolved}
+    merged = [(merged_id, awardee_id) for merged_id, awardee_id in merged.items()
+              if merged_id not in kept_ids]
+
+    if new_clusters:
+        # Canonical names of different clusters never share a normalized name
+        created = execute_values(cur, """
+            INSERT INTO awardees (canonical_name, normalized_name) VALUES %s
+            ON CONFLICT (normalized_name) DO UPDATE
+            SET canonical_name = EXCLUDED.canonical_name
+            RETURNING normalized_name, awardee_id
+        """, new_clusters, page_size=1000, fetch=True)
+        new_ids = dict(created)
+
+    if renamed:
+        execute_values(cur, """
+            UPDATE awardees a SET canonical_name = v.canonical_name
+            FROM (VALUES %s) AS v (awardee_id, canonical_name)
+            WHERE a.awardee_id = v.awardee_id
+        """, renamed, page_size=1000)
+
+    changed = []
+    if merged:
+        execute_values(cur, """
+            UPDATE awardee_aliases t SET awardee_id = v.awardee_id
+            FROM (VALUES %s) AS v (merged_id, awardee_id)
+            WHERE t.awardee_id = v.merged_id
+        """, merged, page_size=1000)
+        moved = execute_values(cur, f"""
+            UPDATE {table} t SET awardee_id = v.awardee_id
+            FROM (VALUES %s) AS v (merged_id, awardee_id)
+            WHERE t.awardee_id = v.merged_id
+            RETURNING t.notice_id
+        """, merged, page_size=1000, fetch=True)
+        changed.extend(row[0] for row in moved)
+        execute_values(cur, """
+            DELETE FROM awardees a USING (VALUES %s) AS v (merged_id)
+            WHERE a.awardee_id = v.merged_id
+        """, [(merged_id,) for merged_id, _ in merged], page_size=1000)
+
+    alias_rows = []
+    report_rows = []
+    for cluster, raws, canonical, awardee_id in resolved:
+        if awardee_id is None:
+            awardee_id = new_ids[normalize_name(canonical)]
+        for name in cluster:
+            for raw in variants[name]:
+                if existing_aliases.get(raw) != (awardee_id, name):
+                    alias_rows.append((raw, awardee_id, name))
+                if len(raws) > 1:
+                    report_rows.append((awardee_id, canonical, raw, name, raw_counts[raw]))
+
+    if alias_rows:
+        execute_values(cur, """
+            INSERT INTO awardee_aliases (raw_name, awardee_id, normalized_name) VALUES %s
+            ON CONFLICT (raw_name) DO UPDATE
+            SET awardee_id = EXCLUDED.awardee_id,
+                normalized_name = EXCLUDED.normalized_name
+        """, alias_rows, page_size=1000)
+
+    cur.execute(f"""
+        UPDATE {table} c
+        SET awardee_id = a.awardee_id
+        FROM awardee_aliases a
+        WHERE a.raw_name = c.awardee
+          AND c.awardee_id IS DISTINCT FROM a.awardee_id
+        RETURNING c.notice_id
+    """)
+    changed.extend(row[0] for row in cur.fetchall())
+    updated = len(changed)
+    if changed:
+        record_epoch(cur, 'resolve_awardees', changed, {'awardee_id': []})
+    conn.commit()
+    cur.close()
+
+    if report_path:
+        write_report(report_rows, report_path)
+
+    print(f"Resolved {len(raw_counts)} awardee names into {len(clusters)} entities "
+          f"({updated} contracts updated)")
+
+def write_report(report_rows, report_path):
+    """Write multi-variant clusters as CSV for review"""
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    report_rows.sort(key=lambda row: (row[0], -row[4], row[2]))
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['awardee_id', 'canonical_name', 'variant', 'normalized_name', 'contract_count'])
+        writer.writerows(report_rows)
+    print(f"Cluster report written to {report_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve awardee names to stable awardee_ids')
+    parser.add_argument('--db-url', help='Database URL (defaults to SUPABASE_DB_URL or the local database)')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='Path of the clusters report CSV')
+    args = parser.parse_args()
+
+    conn = get_connection(args.db_url)
+    try:
+        resolve_awardees(conn, args.report)
+    except Exception as e:
+        print(f"Error resolving awardees: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -69,4 +69,51 @@ INSERT INTO states (code, name) VALUES
 ('WV', 'West Virginia'),
 ('WI', 'Wisconsin'),
 ('WY', 'Wyoming')
-ON CONFLICT (code) DO NOTHING;
\ No newline at end of file
+ON CONFLICT (code) DO NOTHING;
+
+-- Awardee entity resolution (scripts/resolve_awardees.py)
+CREATE TABLE IF NOT EXISTS awardees (
+    awardee_id SERIAL PRIMARY KEY,
+    canonical_name TEXT NOT NULL,
+    normalized_name TEXT UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS awardee_aliases (
+    raw_name TEXT PRIMARY KEY,
+    awardee_id INTEGER NOT NULL REFERENCES awardees(awardee_id),
+    normalized_name TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_awardee_aliases_awardee_id ON awardee_aliases(awardee_id);
+
+ALTER TABLE contracts ADD COLUMN IF NOT EXISTS awardee_id INTEGER REFERENCES awardees(awardee_id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_contracts_awardee_id ON contracts(awardee_id);
+
+
+-- Dataset epochs for API cache invalidation (scripts/dataset_epoch.py)
+-- Each import commit inserts one epoch; API routes key ETags and cached results on the latest one.
+CREATE TABLE IF NOT EXISTS dataset_epochs (
+    epoch BIGSERIAL PRIMARY KEY,
+    source VARCHAR(100),
+    row_count INTEGER NOT NULL DEFAULT 0,
+    dimensions JSONB NOT NULL DEFAULT '{}',
+    committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- notice_ids affected by each epoch
+CREATE TABLE IF NOT EXISTS dataset_changes (
+    epoch BIGINT NOT NULL REFERENCES dataset_epochs(epoch) ON DELETE CASCADE,
+    notice_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (epoch, notice_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_dataset_changes_notice_id ON dataset_changes(notice_id);
+
+
+-- BRIN indexes for time-range scans (rows are loaded in posted_date order;
+-- re-sort older data with scripts/recluster_contracts.py)
+CREATE INDEX IF NOT EXISTS idx_contracts_posted_date_brin
+    ON contracts USING brin (posted_date) WITH (pages_per_range = 32, autosummarize = on);
+CREATE INDEX IF NOT EXISTS idx_contracts_response_deadline_brin
+    ON contracts USING brin (response_deadline) WITH (pages_per_range = 32, autosummarize = on);
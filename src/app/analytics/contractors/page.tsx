@@ -8,6 +8,7 @@ import { US_STATES } from '@/lib/states';
 
 interface ContractorData {
   contractor: string;
+  awardeeId: number | null;
   location: string;
   totalAwards: number;
   awardCount: number;
@@ -16,11 +17,14 @@ interface ContractorData {
   lastAward: string;
 }
 
+// Resolved entities are filtered by awardee id, so every name variant stays included
+type SelectedContractor = Pick<ContractorData, 'contractor' | 'awardeeId'>;
+
 export default function ContractorAnalysisPage() {
   const [contractors, setContractors] = useState<ContractorData[]>([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
-  const [selectedContractors, setSelectedContractors] = useState<string[]>([]);
+  const [selectedContractors, setSelectedContractors] = useState<SelectedContractor[]>([]);
   const [currentPage, setCurrentPage] = useState(1);
   const [pageSize, setPageSize] = useState(25);
   const [total, setTotal] = useState(0);
@@ -44,8 +48,12 @@ export default function ContractorAnalysisPage() {
         params.append('state', stateFilter);
       }
 
-      selectedContractors.forEach(contractor => {
-        params.append('contractor', contractor);
+      selectedContractors.forEach(({ contractor, awardeeId }) => {
+        if (awardeeId != null) {
+          params.append('awardeeId', awardeeId.toString());
+        } else {
+          params.append('contractor', contractor);
+        }
       });
 
       const response = await fetch(`/api/analytics/contractors?${params}`);
@@ -177,15 +185,15 @@ export default function ContractorAnalysisPage() {
             <div className="mt-4">
               <div className="text-sm text-gray-600 dark:text-gray-400 mb-2">Selected Contractors ({selectedContractors.length}):</div>
               <div className="flex flex-wrap gap-2">
-                {selectedContractors.map(contractor => (
+                {selectedContractors.map(selected => (
                   <span
-                    key={contractor}
+                    key={selected.awardeeId ?? selected.contractor}
                     className="inline-flex items-center gap-1 px-3 py-1 bg-indigo-100 dark:bg-indigo-900/30 text-indigo-700 dark:text-indigo-300 rounded-full text-sm"
                   >
-                    {contractor}
+                    {selected.contractor}
                     <button
                       onClick={() => {
-                        setSelectedContractors(prev => prev.filter(c => c !== contractor));
+                        setSelectedContractors(prev => prev.filter(c => c !== selected));
                         setCurrentPage(1);
                       }}
                       className="ml-1 hover:text-indigo-900 dark:hover:text-indigo-200"
@@ -281,8 +289,16 @@ export default function ContractorAnalysisPage() {
                     <td className="px-6 py-4 text-sm font-medium text-gray-900 dark:text-gray-100">
                       <button
                         onClick={() => {
-                          if (!selectedContractors.includes(contractor.contractor)) {
-                            setSelectedContractors(prev => [...prev, contractor.contractor]);
+                          const isSelected = selectedContractors.some(c =>
+                            contractor.awardeeId != null
+                              ? c.awardeeId === contractor.awardeeId
+                              : c.awardeeId == null && c.contractor === contractor.contractor
+                          );
+                          if (!isSelected) {
+                            setSelectedContractors(prev => [
+                              ...prev,
+                              { contractor: contractor.contractor, awardeeId: contractor.awardeeId },
+                            ]);
                             setCurrentPage(1);
                           }
                         }}
@@ -293,6 +293,7 @@ export default function SpendAnalysisPage() {
                       description: opt.sublabel
                     }))}
                     placeholder="Search agencies..."
+                    suggestField="agency"
                   />
                 </div>
               )}
@@ -309,6 +310,7 @@ export default function SpendAnalysisPage() {
                       description: opt.sublabel
                     }))}
                     placeholder="Search NAICS codes..."
+                    suggestField="naics"
                   />
                 </div>
               )}
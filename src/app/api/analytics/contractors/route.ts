@@ -1,120 +1,166 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/lib/supabase';
+import { cachedJson } from '@/lib/cache';
+
+// Cap on alias lookups behind a name search; direct matches on the raw name are not capped
+const MAX_SEARCH_ALIASES = 1000;
+
+// Quotes a value for a PostgREST or() filter, where commas and parentheses are syntax
+function quoteFilterValue(value: string): string {
+  return `"${value.replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`;
+}
+
+// Distinct awardee ids from an awardee_aliases lookup
+async function distinctAwardeeIds(
+  lookup: PromiseLike<{ data: { awardee_id: number }[] | null; error: unknown }>
+): Promise<number[]> {
+  const { data, error } = await lookup;
+  if (error) throw error;
+  return [...new Set((data || []).map(row => row.awardee_id))];
+}
 
 export async function GET(request: NextRequest) {
   try {
     const searchParams = request.nextUrl.searchParams;
     const search = searchParams.get('search') || '';
     const contractors = searchParams.getAll('contractor');
+    const awardeeIds = searchParams.getAll('awardeeId').map(id => parseInt(id)).filter(id => !isNaN(id));
     const dateFrom = searchParams.get('dateFrom');
     const dateTo = searchParams.get('dateTo');
     const page = parseInt(searchParams.get('page') || '1');
     const limit = parseInt(searchParams.get('limit') || '25');
 
-    // Build the query
-    let query = supabase
-      .from('contracts')
-      .select('awardee, state, city, award_amount, posted_date', { count: 'exact' })
-      .not('awardee', 'is', null)
-      .neq('awardee', '')
-      .not('award_amount', 'is', null)
-      .gt('award_amount', 0);
-
-    // Apply filters
-    if (search) {
-      query = query.ilike('awardee', `%${search}%`);
-    }
-
-    if (contractors.length > 0) {
-      query = query.in('awardee', contractors);
-    }
-
-    if (dateFrom) {
-      query = query.gte('posted_date', dateFrom);
-    }
-
-    if (dateTo) {
-      query = query.lte('posted_date', dateTo);
-    }
-
-    // Execute the query to get all matching records
-    const { data, error } = await query;
-    if (error) throw error;
-
-    // Group by contractor
-    const contractorMap = new Map<string, {
-      contractor: string;
-      state?: string;
-      city?: string;
-      awardCount: number;
-      totalAwards: number;
-      avgAwardSize: number;
-      firstAward?: string;
-      lastAward?: string;
-    }>();
-
-    data?.forEach((row) => {
-      const key = `${row.awardee}-${row.state || ''}-${row.city || ''}`;
-      
-      if (!contractorMap.has(key)) {
-        contractorMap.set(key, {
-          contractor: row.awardee,
-          state: row.state,
-          city: row.city,
-          awardCount: 0,
-          totalAwards: 0,
-          avgAwardSize: 0,
-          firstAward: row.posted_date,
-          lastAward: row.posted_date
-        });
+    return await cachedJson(request, async () => {
+      // Build the query
+      let query = supabase
+        .from('contracts')
+        .select('awardee, awardee_id, awardees(canonical_name), state, city, award_amount, posted_date', { count: 'exact' })
+        .not('awardee', 'is', null)
+        .neq('awardee', '')
+        .not('award_amount', 'is', null)
+        .gt('award_amount', 0);
+
+      // Apply filters. Name filters go through awardee_aliases so that an entity keeps
+      // every name variant of its cluster, not just the variants that match the text.
+      if (search) {
+        const ids = await distinctAwardeeIds(
+          supabase.from('awardee_aliases').select('awardee_id').ilike('raw_name', `%${search}%`).limit(MAX_SEARCH_ALIASES)
+        );
+        const conditions = [`awardee.ilike.${quoteFilterValue(`%${search}%`)}`];
+        if (ids.length > 0) conditions.push(`awardee_id.in.(${ids.join(',')})`);
+        query = query.or(conditions.join(','));
       }
 
-      const contractor = contractorMap.get(key)!;
-      contractor.awardCount += 1;
-      contractor.totalAwards += row.award_amount;
-      
-      // Update first and last award dates
-      if (!contractor.firstAward || row.posted_date < contractor.firstAward) {
-        contractor.firstAward = row.posted_date;
+      // Selected contractors are sent as awardeeId; contractor names are for entities
+      // not yet resolved (and older links), matched by raw name or through their aliases
+      if (contractors.length > 0 || awardeeIds.length > 0) {
+        const ids = new Set(awardeeIds);
+        const conditions: string[] = [];
+        if (contractors.length > 0) {
+          const aliasIds = await distinctAwardeeIds(
+            supabase.from('awardee_aliases').select('awardee_id').in('raw_name', contractors)
+          );
+          aliasIds.forEach(id => ids.add(id));
+          conditions.push(`awardee.in.(${contractors.map(quoteFilterValue).join(',')})`);
+        }
+        if (ids.size > 0) conditions.push(`awardee_id.in.(${[...ids].join(',')})`);
+        query = query.or(conditions.join(','));
       }
-      if (!contractor.lastAward || row.posted_date > contractor.lastAward) {
-        contractor.lastAward = row.posted_date;
+
+      if (dateFrom) {
+        query = query.gte('posted_date', dateFrom);
       }
-    });
 
-    // Calculate averages
-    contractorMap.forEach(contractor => {
-      contractor.avgAwardSize = contractor.totalAwards / contractor.awardCount;
-    });
+      if (dateTo) {
+        query = query.lte('posted_date', dateTo);
+      }
 
-    // Convert to array and sort by total awards
-    const allContractors = Array.from(contractorMap.values())
-      .sort((a, b) => b.totalAwards - a.totalAwards);
-
-    // Apply pagination
-    const start = (page - 1) * limit;
-    const paginatedContractors = allContractors.slice(start, start + limit);
-
-    // Format the response
-    const contractorsData = paginatedContractors.map(contractor => ({
-      contractor: contractor.contractor,
-      location: contractor.state ? `${contractor.city || ''}, ${contractor.state}`.trim() : '--',
-      totalAwards: contractor.totalAwards,
-      awardCount: contractor.awardCount,
-      avgAwardSize: contractor.avgAwardSize,
-      firstAward: contractor.firstAward,
-      lastAward: contractor.lastAward
-    }));
-
-    const total = allContractors.length;
-    const totalPages = Math.ceil(total / limit);
-
-    return NextResponse.json({
-      contractors: contractorsData,
-      total,
-      page,
-      limit,
-      totalPages
+      // Execute the query to get all matching records
+      const { data, error } = await query;
+      if (error) throw error;
+
+      // Group by resolved awardee entity; rows not yet resolved fall back to the raw name and location
+      const contractorMap = new Map<string, {
+        contractor: string;
+        awardeeId: number | null;
+        state?: string;
+        city?: string;
+        awardCount: number;
+        totalAwards: number;
+        avgAwardSize: number;
+        firstAward?: string;
+        lastAward?: string;
+      }>();
+
+      data?.forEach((row) => {
+        const key = row.awardee_id != null
+          ? `id:${row.awardee_id}`
+          : `${row.awardee}-${row.state || ''}-${row.city || ''}`;
+        const resolved = row.awardees as { canonical_name?: string } | { canonical_name?: string }[] | null;
+        const canonicalName = Array.isArray(resolved) ? resolved[0]?.canonical_name : resolved?.canonical_name;
+      
+        if (!contractorMap.has(key)) {
+          contractorMap.set(key, {
+            contractor: canonicalName || row.awardee,
+            awardeeId: row.awardee_id ?? null,
+            state: row.state,
+            city: row.city,
+            awardCount: 0,
+            totalAwards: 0,
+            avgAwardSize: 0,
+            firstAward: row.posted_date,
+            lastAward: row.posted_date
+          });
+        }
+
+        const contractor = contractorMap.get(key)!;
+        contractor.awardCount += 1;
+        contractor.totalAwards += row.award_amount;
+      
+        // Update first and last award dates
+        if (!contractor.firstAward || row.posted_date < contractor.firstAward) {
+          contractor.firstAward = row.posted_date;
+        }
+        if (!contractor.lastAward || row.posted_date > contractor.lastAward) {
+          contractor.lastAward = row.posted_date;
+        }
+      });
+
+      // Calculate averages
+      contractorMap.forEach(contractor => {
+        contractor.avgAwardSize = contractor.totalAwards / contractor.awardCount;
+      });
+
+      // Convert to array and sort by total awards
+      const allContractors = Array.from(contractorMap.values())
+        .sort((a, b) => b.totalAwards - a.totalAwards);
+
+      // Apply pagination
+      const start = (page - 1) * limit;
+      const paginatedContractors = allContractors.slice(start, start + limit);
+
+      // Format the response
+      const contractorsData = paginatedContractors.map(contractor => ({
+        contractor: contractor.contractor,
+        awardeeId: contractor.awardeeId,
+        location: contractor.state ? `${contractor.city || ''}, ${contractor.state}`.trim() : '--',
+        totalAwards: contractor.totalAwards,
+        awardCount: contractor.awardCount,
+        avgAwardSize: contractor.avgAwardSize,
+        firstAward: contractor.firstAward,
+        lastAward: contractor.lastAward
+      }));
+
+      const total = allContractors.length;
+      const totalPages = Math.ceil(total / limit);
+
+      return {
+        contractors: contractorsData,
+        total,
+        page,
+        limit,
+        totalPages
+      };
     });
   } catch (error) {
     console.error('Error in contractor analysis:', error);
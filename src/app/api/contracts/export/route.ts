@@ -0,0 +1,74 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { ContractFilters } from '@/types/contract';
+import {
+  EXPORT_FORMATS,
+  ExportFormat,
+  streamContracts,
+  tryAcquireExportSlot,
+} from '@/lib/export';
+
+const CONTENT_TYPES: Record<ExportFormat, string> = {
+  csv: 'text/csv; charset=utf-8',
+  ndjson: 'application/x-ndjson; charset=utf-8',
+};
+
+export async function GET(request: NextRequest) {
+  const searchParams = request.nextUrl.searchParams;
+  const format = (searchParams.get('format') || 'csv') as ExportFormat | 'parquet';
+
+  if (format === 'parquet') {
+    return NextResponse.json(
+      { error: 'Parquet exports are produced by scripts/export_contracts.py --format parquet' },
+      { status: 400 }
+    );
+  }
+
+  if (!EXPORT_FORMATS.includes(format)) {
+    return NextResponse.json(
+      { error: `format must be one of: ${EXPORT_FORMATS.join(', ')}` },
+      { status: 400 }
+    );
+  }
+
+  const filters: ContractFilters = {
+    keyword: searchParams.get('keyword') || undefined,
+    type: searchParams.get('type') || undefined,
+    department_agency: searchParams.get('department_agency') || undefined,
+    sub_tier: searchParams.get('sub_tier') || undefined,
+    set_aside: searchParams.get('set_aside') || undefined,
+    naics_code: searchParams.get('naics_code') || undefined,
+    state: searchParams.get('state') || undefined,
+    city: searchParams.get('city') || undefined,
+    posted_date_from: searchParams.get('posted_date_from') || undefined,
+    posted_date_to: searchParams.get('posted_date_to') || undefined,
+    response_deadline_from: searchParams.get('response_deadline_from') || undefined,
+    response_deadline_to: searchParams.get('response_deadline_to') || undefined,
+    sort_by: searchParams.get('sort_by') || undefined,
+    sort_order: (searchParams.get('sort_order') || 'desc') as 'asc' | 'desc',
+  };
+
+  if (!tryAcquireExportSlot()) {
+    return NextResponse.json(
+      { error: 'Too many exports in progress, try again shortly' },
+      { status: 429, headers: { 'Retry-After': '30' } }
+    );
+  }
+
+  try {
+    // streamContracts owns the slot from here on and releases it when the stream ends
+    const stream = await streamContracts(filters, format);
+    return new NextResponse(stream, {
+      headers: {
+        'Content-Type': CONTENT_TYPES[format],
+        'Content-Disposition': `attachment; filename="contracts.${format}"`,
+        'Cache-Control': 'no-store',
+      },
+    });
+  } catch (error) {
+    console.error('Error exporting contracts:', error);
+    return NextResponse.json(
+      { error: 'Failed to export contracts' },
+      { status: 500 }
+    );
+  }
+}
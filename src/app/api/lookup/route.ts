@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/lib/supabase';
+import { cachedJson } from '@/lib/cache';
 
 export async function GET(request: NextRequest) {
   try {
@@ -7,72 +8,78 @@ export async function GET(request: NextRequest) {
     const type = searchParams.get('type');
     const code = searchParams.get('code');
 
-    if (type === 'state' && code) {
-      const { data, error } = await supabase
-        .from('states')
-        .select('name')
-        .eq('code', code.toUpperCase())
-        .single();
+    if (!((type === 'state' || type === 'naics') && code) && type !== 'states') {
+      return NextResponse.json({ error: 'Invalid request' }, { status: 400 });
+    }
+
+    return await cachedJson(request, async () => {
+      if (type === 'state' && code) {
+        const { data, error } = await supabase
+          .from('states')
+          .select('name')
+          .eq('code', code.toUpperCase())
+          .single();
       
-      if (error && error.code !== 'PGRST116') throw error; // PGRST116 is "no rows found"
+        if (error && error.code !== 'PGRST116') throw error; // PGRST116 is "no rows found"
       
-      if (data) {
-        return NextResponse.json({ name: data.name });
+        if (data) {
+          return { name: data.name };
+        }
+        return { name: null };
       }
-      return NextResponse.json({ name: null });
-    }
 
-    if (type === 'naics' && code) {
-      // Try exact match first
-      let data = null;
-      try {
-        const result = await supabase
-          .from('naics_codes')
-          .select('code, title')
-          .eq('code', code)
-          .single();
+      if (type === 'naics' && code) {
+        // Try exact match first
+        let data = null;
+        try {
+          const result = await supabase
+            .from('naics_codes')
+            .select('code, title')
+            .eq('code', code)
+            .single();
         
-        if (result.error && result.error.code !== 'PGRST116') throw result.error;
-        data = result.data;
-      } catch (err) {
-        // Single row not found is ok, other errors should throw
-        if (err instanceof Error && !err.message.includes('PGRST116')) throw err;
-      }
+          if (result.error && result.error.code !== 'PGRST116') throw result.error;
+          data = result.data;
+        } catch (err) {
+          // Single row not found is ok, other errors should throw
+          if (err instanceof Error && !err.message.includes('PGRST116')) throw err;
+        }
       
-      // If no exact match, try prefix match for hierarchical codes
-      if (!data && code.length >= 2) {
-        const { data: prefixData, error: prefixError } = await supabase
-          .from('naics_codes')
-          .select('code, title')
-          .like('code', `${code}%`)
-          .order('code', { ascending: false })
-          .limit(1);
+        // If no exact match, try prefix match for hierarchical codes
+        if (!data && code.length >= 2) {
+          const { data: prefixData, error: prefixError } = await supabase
+            .from('naics_codes')
+            .select('code, title')
+            .like('code', `${code}%`)
+            .order('code', { ascending: false })
+            .limit(1);
         
-        if (prefixError) throw prefixError;
-        data = prefixData?.[0];
-      }
+          if (prefixError) throw prefixError;
+          data = prefixData?.[0];
+        }
       
-      if (data) {
-        return NextResponse.json({ 
-          code: data.code,
-          title: data.title 
-        });
+        if (data) {
+          return { 
+            code: data.code,
+            title: data.title 
+          };
+        }
+        return { code: null, title: null };
       }
-      return NextResponse.json({ code: null, title: null });
-    }
 
-    if (type === 'states') {
-      const { data, error } = await supabase
-        .from('states')
-        .select('code, name')
-        .order('name');
+      if (type === 'states') {
+        const { data, error } = await supabase
+          .from('states')
+          .select('code, name')
+          .order('name');
       
-      if (error) throw error;
+        if (error) throw error;
       
-      return NextResponse.json(data || []);
-    }
+        return data || [];
+      }
 
-    return NextResponse.json({ error: 'Invalid request' }, { status: 400 });
+      return null;
+    });
   } catch (error) {
     console.error('Error in lookup:', error);
     return NextResponse.json(
@@ -0,0 +1,78 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { supabase } from '@/lib/supabase';
+import {
+  loadSuggestionIndex,
+  suggest,
+  Suggestion,
+  SuggestField,
+  SUGGEST_FIELDS,
+  MAX_SUGGESTIONS,
+} from '@/lib/suggestions';
+
+// Column used by the database fallback when the suggestion index has not been built
+const FALLBACK_COLUMNS: Record<SuggestField, string> = {
+  agency: 'department_agency',
+  sub_tier: 'sub_tier',
+  office: 'office',
+  awardee: 'awardee',
+  naics: 'naics_code',
+  city: 'city',
+};
+
+async function suggestFromDatabase(field: SuggestField, query: string, limit: number): Promise<Suggestion[]> {
+  if (field === 'naics') {
+    const { data, error } = await supabase
+      .from('naics_codes')
+      .select('code, title')
+      .like('code', `${query}%`)
+      .order('code')
+      .limit(limit);
+    if (error) throw error;
+    return (data || []).map(row => ({ value: row.code, label: `${row.code} - ${row.title}`, weight: 0 }));
+  }
+
+  const column = FALLBACK_COLUMNS[field];
+  const { data, error } = await supabase
+    .from('contracts')
+    .select(column)
+    .ilike(column, `${query}%`)
+    .order(column)
+    .limit(limit * 5);
+  if (error) throw error;
+
+  const values = [...new Set((data as unknown as Record<string, string>[] || []).map(row => row[column]))];
+  return values.slice(0, limit).map(value => ({ value, label: value, weight: 0 }));
+}
+
+export async function GET(request: NextRequest) {
+  try {
+    const searchParams = request.nextUrl.searchParams;
+    const field = searchParams.get('field') as SuggestField | null;
+    const query = searchParams.get('q') || '';
+    const limit = Math.min(parseInt(searchParams.get('limit') || '10'), MAX_SUGGESTIONS);
+
+    if (!field || !SUGGEST_FIELDS.includes(field)) {
+      return NextResponse.json(
+        { error: `field must be one of: ${SUGGEST_FIELDS.join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    if (!query.trim()) {
+      return NextResponse.json({ suggestions: [] });
+    }
+
+    const index = loadSuggestionIndex();
+    const suggestions = index
+      ? suggest(index, field, query, limit)
+      : await suggestFromDatabase(field, query.trim(), limit);
+
+    return NextResponse.json({ suggestions });
+  } catch (error) {
+    console.error('Error fetching suggestions:', error);
+    return NextResponse.json(
+      { error: 'Failed to fetch suggestions' },
+      { status: 500 }
+    );
+  }
+}
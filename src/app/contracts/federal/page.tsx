@@ -231,6 +231,7 @@ export default function FederalContractsPage() {
                     }))
                   ])}
                   placeholder="Search agencies..."
+                  suggestField="agency"
                 />
               </div>
 
@@ -260,6 +261,7 @@ export default function FederalContractsPage() {
                     label: code
                   }))}
                   placeholder="Search NAICS codes..."
+                  suggestField="naics"
                 />
               </div>
 
@@ -16,6 +16,8 @@ interface AutocompleteInputProps {
   options: AutocompleteOption[];
   placeholder?: string;
   className?: string;
+  // Field of the /api/suggest index to query as the user types (agency, naics, awardee, ...)
+  suggestField?: string;
 }
 
 export default function AutocompleteInput({
@@ -23,11 +25,13 @@ export default function AutocompleteInput({
   onChange,
   options,
   placeholder = 'Search...',
-  className
+  className,
+  suggestField
 }: AutocompleteInputProps) {
   const [isOpen, setIsOpen] = useState(false);
   const [search, setSearch] = useState(value);
   const [filteredOptions, setFilteredOptions] = useState<AutocompleteOption[]>([]);
+  const [remoteOptions, setRemoteOptions] = useState<AutocompleteOption[]>([]);
   const inputRef = useRef<HTMLInputElement>(null);
   const dropdownRef = useRef<HTMLDivElement>(null);
 
@@ -35,6 +39,32 @@ export default function AutocompleteInput({
     setSearch(value);
   }, [value]);
 
+  // Fetch ranked prefix matches from the suggestion index
+  useEffect(() => {
+    if (!suggestField || !search) {
+      setRemoteOptions([]);
+      return;
+    }
+
+    const controller = new AbortController();
+    const timeout = setTimeout(() => {
+      const params = new URLSearchParams({ field: suggestField, q: search, limit: '10' });
+      fetch(`/api/suggest?${params}`, { signal: controller.signal })
+        .then(res => res.json())
+        .then(data => setRemoteOptions((data.suggestions || []).map((s: AutocompleteOption) => ({
+          value: s.value,
+          label: s.label,
+          description: s.description
+        }))))
+        .catch(() => {});
+    }, 150);
+
+    return () => {
+      clearTimeout(timeout);
+      controller.abort();
+    };
+  }, [search, suggestField]);
+
   useEffect(() => {
     if (search) {
       const filtered = options.filter(option =>
@@ -42,11 +72,13 @@ export default function AutocompleteInput({
         option.label.toLowerCase().includes(search.toLowerCase()) ||
         (option.description && option.description.toLowerCase().includes(search.toLowerCase()))
       );
-      setFilteredOptions(filtered.slice(0, 10)); // Limit to 10 results
+      const seen = new Set(remoteOptions.map(option => option.value));
+      const merged = [...remoteOptions, ...filtered.filter(option => !seen.has(option.value))];
+      setFilteredOptions(merged.slice(0, 10)); // Limit to 10 results
     } else {
       setFilteredOptions([]);
     }
-  }, [search, options]);
+  }, [search, options, remoteOptions]);
 
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
@@ -0,0 +1,153 @@
+// Client for the local columnar analytics service (scripts/analytics_server.py).
+// Routes fall back to querying Supabase when the service is not configured or unavailable.
+const ANALYTICS_SERVICE_URL = process.env.ANALYTICS_SERVICE_URL;
+const ANALYTICS_TIMEOUT_MS = 2000;
+
+export interface AnalyticsRow {
+  state?: string;
+  state_label?: string | null;
+  agency?: string;
+  sub_tier?: string;
+  naics?: string;
+  naics_label?: string | null;
+  awardee?: string;
+  city?: string;
+  year?: number;
+  month?: number;
+  contract_count: number;
+  total_amount: number;
+  avg_amount: number;
+}
+
+interface AnalyticsResponse {
+  rows: AnalyticsRow[];
+  groups: number;
+  snapshot: string;
+  elapsed_ms: number;
+}
+
+export function isAnalyticsServiceEnabled(): boolean {
+  return Boolean(ANALYTICS_SERVICE_URL);
+}
+
+export async function queryAnalytics(
+  params: Record<string, string | string[] | undefined>
+): Promise<AnalyticsResponse | null> {
+  if (!ANALYTICS_SERVICE_URL) return null;
+
+  const search = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value === undefined) return;
+    (Array.isArray(value) ? value : [value]).forEach(v => search.append(key, v));
+  });
+
+  try {
+    const response = await fetch(`${ANALYTICS_SERVICE_URL}/query?${search}`, {
+      cache: 'no-store',
+      signal: AbortSignal.timeout(ANALYTICS_TIMEOUT_MS),
+    });
+    if (!response.ok) return null;
+    return await response.json();
+  } catch (error) {
+    console.error('Analytics service unavailable:', error);
+    return null;
+  }
+}
+
+type SpendGroupBy = 'geography' | 'agency' | 'naics';
+
+// Year the Supabase spend path assigns to contracts without a posted_date
+const UNDATED_YEAR = '2020';
+
+const SPEND_DIMENSIONS: Record<SpendGroupBy, 'state' | 'agency' | 'naics'> = {
+  geography: 'state',
+  agency: 'agency',
+  naics: 'naics',
+};
+
+// Answers the /api/analytics/spend query in the same response shape as the Supabase path
+export async function fetchSpendFromService(
+  groupBy: string,
+  filters: { states: string[]; agencies: string[]; naicsCodes: string[] },
+  limit: number
+) {
+  const dimension = SPEND_DIMENSIONS[groupBy as SpendGroupBy];
+  if (!dimension) return null;
+
+  const baseFilters = {
+    state: filters.states.length > 0 ? filters.states : undefined,
+    agency: filters.agencies.length > 0 ? filters.agencies : undefined,
+    naics: filters.naicsCodes.length > 0 ? filters.naicsCodes : undefined,
+  };
+
+  // Top entities by total spend, then the per-year breakdown for just those entities
+  const totals = await queryAnalytics({ ...baseFilters, group_by: dimension, top: String(limit) });
+  if (!totals) return null;
+
+  const names = totals.rows.map(row => row[dimension] as string);
+  const yearly = names.length > 0
+    ? await queryAnalytics({ ...baseFilters, [dimension]: names, group_by: `${dimension},year` })
+    : { rows: [] as AnalyticsRow[] };
+  if (!yearly) return null;
+
+  // The Supabase path also returns a sub_tier per agency; use each agency's largest one
+  const subTiers = new Map<string, string>();
+  if (dimension === 'agency' && names.length > 0) {
+    const bySubTier = await queryAnalytics({ ...baseFilters, agency: names, group_by: 'agency,sub_tier' });
+    if (!bySubTier) return null;
+    // Rows come back ordered by total spend, so the first one per agency is its largest
+    bySubTier.rows.forEach(row => {
+      if (!subTiers.has(row.agency as string)) subTiers.set(row.agency as string, row.sub_tier as string);
+    });
+  }
+
+  const years = new Map<string, Record<string, {contract_count: number; total_amount: number; avg_amount: number}>>();
+  yearly.rows.forEach(row => {
+    const name = row[dimension] as string;
+    if (!years.has(name)) years.set(name, {});
+    years.get(name)![String(row.year)] = {
+      contract_count: row.contract_count,
+      total_amount: row.total_amount,
+      avg_amount: row.avg_amount,
+    };
+  });
+
+  const data = totals.rows.map(row => {
+    const name = row[dimension] as string;
+    const entityYears = years.get(name) || {};
+
+    // The year breakdown skips rows without a posted_date; like the Supabase path,
+    // count them under 2020 so the years still add up to the total
+    let datedCount = 0;
+    let datedAmount = 0;
+    Object.values(entityYears).forEach(year => {
+      datedCount += year.contract_count;
+      datedAmount += year.total_amount;
+    });
+    const undatedCount = row.contract_count - datedCount;
+    if (undatedCount > 0) {
+      const bucket = entityYears[UNDATED_YEAR] || { contract_count: 0, total_amount: 0, avg_amount: 0 };
+      bucket.contract_count += undatedCount;
+      bucket.total_amount += row.total_amount - datedAmount;
+      bucket.avg_amount = bucket.total_amount / bucket.contract_count;
+      entityYears[UNDATED_YEAR] = bucket;
+    }
+
+    return {
+      name,
+      ...(dimension === 'state' && { state_name: row.state_label || name }),
+      ...(dimension === 'naics' && { naics_title: row.naics_label || undefined }),
+      ...(dimension === 'agency' && { sub_tier: subTiers.get(name) }),
+      years: entityYears,
+      total: row.total_amount,
+      contract_count: row.contract_count,
+    };
+  });
+
+  return {
+    data,
+    total: totals.groups,
+    isLimited: totals.groups > limit,
+    groupBy,
+  };
+}
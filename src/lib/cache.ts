@@ -0,0 +1,80 @@
+import { createHash } from 'crypto';
+import { NextRequest, NextResponse } from 'next/server';
+import { supabase } from '@/lib/supabase';
+
+// Results are keyed by query plus dataset epoch. The import scripts bump the epoch
+// (dataset_epochs table) in the same transaction as every data commit, so a cached
+// entry or ETag can only be served while the data it was computed from is current.
+const MAX_ENTRIES = 500;
+
+const resultCache = new Map<string, unknown>();
+let epochRequest: Promise<number | null> | null = null;
+
+async function fetchDatasetEpoch(): Promise<number | null> {
+  const { data, error } = await supabase
+    .from('dataset_epochs')
+    .select('epoch')
+    .order('epoch', { ascending: false })
+    .limit(1);
+  if (error) {
+    console.error('Error fetching dataset epoch:', error);
+    return null;
+  }
+  return data?.[0]?.epoch ?? 0;
+}
+
+// Concurrent requests share one epoch lookup
+export function getDatasetEpoch(): Promise<number | null> {
+  if (!epochRequest) {
+    epochRequest = fetchDatasetEpoch().finally(() => {
+      epochRequest = null;
+    });
+  }
+  return epochRequest;
+}
+
+function cacheKey(request: NextRequest): string {
+  const params = Array.from(request.nextUrl.searchParams.entries())
+    .sort(([a, av], [b, bv]) => (a === b ? av.localeCompare(bv) : a.localeCompare(b)));
+  return `${request.nextUrl.pathname}?${new URLSearchParams(params)}`;
+}
+
+function remember(key: string, value: unknown) {
+  resultCache.set(key, value);
+  if (resultCache.size > MAX_ENTRIES) {
+    resultCache.delete(resultCache.keys().next().value as string);
+  }
+}
+
+// Serves a JSON result with ETag / Cache-Control headers, answering 304 or from the
+// in-process cache when the dataset epoch has not changed since it was computed
+export async function cachedJson<T>(request: NextRequest, compute: () => Promise<T>): Promise<NextResponse> {
+  const epoch = await getDatasetEpoch();
+  if (epoch === null) {
+    return NextResponse.json(await compute());
+  }
+
+  const key = cacheKey(request);
+  const etag = `"${epoch}-${createHash('sha1').update(key).digest('hex').slice(0, 16)}"`;
+  const headers = {
+    ETag: etag,
+    'Cache-Control': 'public, no-cache',
+  };
+
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers });
+  }
+
+  const entryKey = `${epoch}:${key}`;
+  let body = resultCache.get(entryKey) as T | undefined;
+  if (body !== undefined) {
+    // Refresh recency
+    resultCache.delete(entryKey);
+    resultCache.set(entryKey, body);
+  } else {
+    body = await compute();
+    remember(entryKey, body);
+  }
+
+  return NextResponse.json(body, { headers });
+}
@@ -0,0 +1,197 @@
+// Streaming export of filtered contracts through a server-side cursor.
+// Rows are fetched in batches on demand (the stream's pull), so memory stays
+// constant and a slow client only slows its own cursor. scripts/export_contracts.py
+// is the batch counterpart and also writes Parquet.
+import { Pool, PoolClient } from 'pg';
+import localPool from '@/lib/db';
+import { ContractFilters } from '@/types/contract';
+
+export type ExportFormat = 'csv' | 'ndjson';
+
+export const EXPORT_FORMATS: ExportFormat[] = ['csv', 'ndjson'];
+
+// Interpolated into ORDER BY, so only these columns are accepted
+export const SORTABLE_COLUMNS = [
+  'posted_date', 'response_deadline', 'award_amount', 'notice_id', 'title', 'department_agency',
+];
+
+const FETCH_SIZE = 2000;
+
+// Keep most of the pool for the regular API routes
+const MAX_CONCURRENT_EXPORTS = parseInt(process.env.EXPORT_MAX_CONCURRENCY || '2');
+let activeExports = 0;
+
+let exportPool: Pool | null = null;
+
+// Exports read the same Postgres as the API routes: SUPABASE_DB_URL (server-only, like
+// scripts/db_utils.py), or the local DB_* database in development mode
+function getExportPool(): Pool {
+  if (!exportPool) {
+    if (process.env.SUPABASE_DB_URL) {
+      exportPool = new Pool({
+        connectionString: process.env.SUPABASE_DB_URL,
+        max: MAX_CONCURRENT_EXPORTS,
+        idleTimeoutMillis: 30000,
+        connectionTimeoutMillis: 5000,
+      });
+    } else if (process.env.NEXT_PUBLIC_DATABASE_MODE === 'development') {
+      exportPool = localPool;
+    } else {
+      throw new Error('SUPABASE_DB_URL is not set; exports need a direct connection to the Supabase database');
+    }
+  }
+  return exportPool;
+}
+
+// Same filter semantics as /api/contracts
+export function buildContractWhere(filters: ContractFilters): { where: string; params: string[] } {
+  const conditions: string[] = [];
+  const params: string[] = [];
+
+  if (filters.keyword) {
+    params.push(`%${filters.keyword}%`);
+    const p = `$${params.length}`;
+    conditions.push(
+      `(title ILIKE ${p} OR description ILIKE ${p} OR department_agency ILIKE ${p} OR sub_tier ILIKE ${p} OR office ILIKE ${p})`
+    );
+  }
+
+  const equalities: (keyof ContractFilters)[] = ['type', 'department_agency', 'sub_tier', 'set_aside', 'naics_code', 'state'];
+  equalities.forEach(column => {
+    const value = filters[column];
+    if (value) {
+      params.push(String(value));
+      conditions.push(`${column} = $${params.length}`);
+    }
+  });
+
+  if (filters.city) {
+    params.push(`${filters.city}%`);
+    conditions.push(`city ILIKE $${params.length}`);
+  }
+
+  const ranges: [keyof ContractFilters, string, string][] = [
+    ['posted_date_from', 'posted_date', '>='],
+    ['posted_date_to', 'posted_date', '<='],
+    ['response_deadline_from', 'response_deadline', '>='],
+    ['response_deadline_to', 'response_deadline', '<='],
+  ];
+  ranges.forEach(([filter, column, op]) => {
+    const value = filters[filter];
+    if (value) {
+      params.push(String(value));
+      conditions.push(`${column} ${op} $${params.length}`);
+    }
+  });
+
+  return {
+    where: conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : '',
+    params,
+  };
+}
+
+function csvField(value: string | null): string {
+  // As in COPY ... (FORMAT csv): NULL is an empty field, an empty string is quoted
+  if (value === null) return '';
+  if (value === '') return '""';
+  return /[",\r\n]/.test(value) ? `"${value.replace(/"/g, '""')}"` : value;
+}
+
+// Values are fetched as PostgreSQL text output, so CSV matches COPY ... (FORMAT csv)
+const rawTypes = { getTypeParser: () => (value: string) => value };
+
+export function tryAcquireExportSlot(): boolean {
+  if (activeExports >= MAX_CONCURRENT_EXPORTS) return false;
+  activeExports++;
+  return true;
+}
+
+export function releaseExportSlot() {
+  activeExports = Math.max(0, activeExports - 1);
+}
+
+// Returns a byte stream of the export; the caller must hold an export slot, which is
+// released when the stream finishes, fails or is cancelled by the client
+export async function streamContracts(
+  filters: ContractFilters,
+  format: ExportFormat
+): Promise<ReadableStream<Uint8Array>> {
+  const { where, params } = buildContractWhere(filters);
+  let order = '';
+  if (filters.sort_by && SORTABLE_COLUMNS.includes(filters.sort_by)) {
+    order = `ORDER BY ${filters.sort_by} ${filters.sort_order === 'asc' ? 'ASC' : 'DESC'} NULLS LAST`;
+  }
+  const select = `SELECT * FROM contracts ${where} ${order}`;
+  const cursorQuery = format === 'ndjson'
+    ? `SELECT row_to_json(c)::text AS line FROM (${select}) c`
+    : select;
+
+  const encoder = new TextEncoder();
+  let client: PoolClient | null;
+  try {
+    client = await getExportPool().connect();
+  } catch (error) {
+    releaseExportSlot();
+    throw error;
+  }
+  let headerWritten = false;
+
+  const finish = async (error?: Error) => {
+    if (!client) return;
+    const done = client;
+    client = null;
+    try {
+      await done.query(error ? 'ROLLBACK' : 'COMMIT');
+      done.release();
+    } catch (e) {
+      done.release(e as Error);
+    } finally {
+      releaseExportSlot();
+    }
+  };
+
+  try {
+    // One read-only snapshot for the whole export
+    await client.query('BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY');
+    await client.query(`DECLARE contracts_export NO SCROLL CURSOR FOR ${cursorQuery}`, params);
+  } catch (error) {
+    await finish(error as Error);
+    throw error;
+  }
+
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      if (!client) return;
+      try {
+        const result = await client.query({
+          text: `FETCH ${FETCH_SIZE} FROM contracts_export`,
+          types: rawTypes,
+        });
+
+        let chunk = '';
+        if (format === 'csv' && !headerWritten) {
+          chunk += result.fields.map(field => csvField(field.name)).join(',') + '\n';
+          headerWritten = true;
+        }
+        for (const row of result.rows) {
+          chunk += format === 'ndjson'
+            ? `${row.line}\n`
+            : result.fields.map(field => csvField(row[field.name])).join(',') + '\n';
+        }
+        if (chunk) controller.enqueue(encoder.encode(chunk));
+
+        if (result.rows.length < FETCH_SIZE) {
+          await finish();
+          controller.close();
+        }
+      } catch (error) {
+        console.error('Error streaming contracts export:', error);
+        await finish(error as Error);
+        controller.error(error);
+      }
+    },
+    async cancel() {
+      await finish(new Error('Export cancelled by client'));
+    },
+  });
+}
@@ -0,0 +1,91 @@
+import fs from 'fs';
+import path from 'path';
+
+// Prefix index built by scripts/build_suggestions.py
+const INDEX_PATH = process.env.SUGGEST_INDEX_PATH || path.join(process.cwd(), 'data', 'suggestions.json');
+
+export const SUGGEST_FIELDS = ['agency', 'sub_tier', 'office', 'awardee', 'naics', 'city'] as const;
+export type SuggestField = typeof SUGGEST_FIELDS[number];
+
+// Largest limit /api/suggest accepts; the builder's TOP_K must be at least this
+export const MAX_SUGGESTIONS = 50;
+
+export interface Suggestion {
+  value: string;
+  label: string;
+  description?: string;
+  weight: number;
+}
+
+interface FieldIndex {
+  // [value, label, description, weight], ordered by weight descending
+  entries: [string, string, string | null, number][];
+  // [lowercase key, entry index], sorted by key
+  keys: [string, number][];
+  // Precomputed best entry indexes for every prefix matching more than scan_limit keys
+  top: Record<string, number[]>;
+}
+
+interface SuggestionIndex {
+  built_at: string;
+  scan_limit: number;
+  top_k: number;
+  fields: Record<SuggestField, FieldIndex>;
+}
+
+let cached: { index: SuggestionIndex; mtimeMs: number } | null = null;
+
+// Loads the index, reloading it when the builder replaces the file
+export function loadSuggestionIndex(): SuggestionIndex | null {
+  let mtimeMs: number;
+  try {
+    mtimeMs = fs.statSync(INDEX_PATH).mtimeMs;
+  } catch {
+    return null;
+  }
+  if (!cached || cached.mtimeMs !== mtimeMs) {
+    const index = JSON.parse(fs.readFileSync(INDEX_PATH, 'utf-8')) as SuggestionIndex;
+    cached = { index, mtimeMs };
+  }
+  return cached.index;
+}
+
+function lowerBound(keys: [string, number][], prefix: string): number {
+  let lo = 0;
+  let hi = keys.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (keys[mid][0] < prefix) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+}
+
+export function suggest(index: SuggestionIndex, field: SuggestField, query: string, limit: number): Suggestion[] {
+  const fieldIndex = index.fields[field];
+  const prefix = query.trim().toLowerCase().replace(/\s+/g, ' ');
+  if (!fieldIndex || !prefix) return [];
+
+  let matches: number[];
+  if (fieldIndex.top[prefix]) {
+    matches = fieldIndex.top[prefix];
+  } else {
+    // Prefixes without a top list match at most scan_limit keys, so the whole range is
+    // scanned; lower entry index means higher weight, so keep the smallest indexes
+    const found = new Set<number>();
+    for (let i = lowerBound(fieldIndex.keys, prefix); i < fieldIndex.keys.length; i++) {
+      const [key, entry] = fieldIndex.keys[i];
+      if (!key.startsWith(prefix)) break;
+      found.add(entry);
+    }
+    matches = Array.from(found).sort((a, b) => a - b);
+  }
+
+  return matches.slice(0, limit).map(i => {
+    const [value, label, description, weight] = fieldIndex.entries[i];
+    return { value, label, description: description || undefined, weight };
+  });
+}
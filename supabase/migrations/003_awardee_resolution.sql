@@ -0,0 +1,19 @@
+-- Awardee entity resolution (scripts/resolve_awardees.py)
+CREATE TABLE IF NOT EXISTS awardees (
+    awardee_id SERIAL PRIMARY KEY,
+    canonical_name TEXT NOT NULL,
+    normalized_name TEXT UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Every raw awardee string seen in contracts, mapped to its resolved entity
+CREATE TABLE IF NOT EXISTS awardee_aliases (
+    raw_name TEXT PRIMARY KEY,
+    awardee_id INTEGER NOT NULL REFERENCES awardees(awardee_id),
+    normalized_name TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_awardee_aliases_awardee_id ON awardee_aliases(awardee_id);
+
+ALTER TABLE contracts ADD COLUMN IF NOT EXISTS awardee_id INTEGER REFERENCES awardees(awardee_id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_contracts_awardee_id ON contracts(awardee_id);
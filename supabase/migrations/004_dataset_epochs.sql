@@ -0,0 +1,18 @@
+-- Dataset epochs for API cache invalidation (scripts/dataset_epoch.py)
+-- Each import commit inserts one epoch; API routes key ETags and cached results on the latest one.
+CREATE TABLE IF NOT EXISTS dataset_epochs (
+    epoch BIGSERIAL PRIMARY KEY,
+    source VARCHAR(100),
+    row_count INTEGER NOT NULL DEFAULT 0,
+    dimensions JSONB NOT NULL DEFAULT '{}',
+    committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- notice_ids affected by each epoch
+CREATE TABLE IF NOT EXISTS dataset_changes (
+    epoch BIGINT NOT NULL REFERENCES dataset_epochs(epoch) ON DELETE CASCADE,
+    notice_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (epoch, notice_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_dataset_changes_notice_id ON dataset_changes(notice_id);
@@ -0,0 +1,214 @@
+-- Dictionary-encode the repetitive agency / office / type columns of contracts.
+-- The physical table becomes contract_facts with small integer keys; a view named
+-- contracts joins the names back so existing queries keep working unchanged.
+
+-- Dimension tables
+CREATE TABLE IF NOT EXISTS dim_department_agency (
+    id SMALLSERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dim_sub_tier (
+    id SMALLSERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dim_office (
+    id SERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dim_fullparentpathname (
+    id SERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dim_organization_type (
+    id SMALLSERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dim_type (
+    id SMALLSERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+INSERT INTO dim_department_agency (name)
+SELECT DISTINCT department_agency FROM contracts WHERE department_agency IS NOT NULL ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_sub_tier (name)
+SELECT DISTINCT sub_tier FROM contracts WHERE sub_tier IS NOT NULL ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_office (name)
+SELECT DISTINCT office FROM contracts WHERE office IS NOT NULL ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_fullparentpathname (name)
+SELECT DISTINCT fullparentpathname FROM contracts WHERE fullparentpathname IS NOT NULL ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_organization_type (name)
+SELECT DISTINCT organization_type FROM contracts WHERE organization_type IS NOT NULL ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_type (name)
+SELECT DISTINCT type FROM contracts WHERE type IS NOT NULL ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+-- The analytics views read the text columns; they are recreated over the view below
+DROP MATERIALIZED VIEW IF EXISTS mv_spend_by_state;
+DROP MATERIALIZED VIEW IF EXISTS mv_spend_by_agency;
+DROP MATERIALIZED VIEW IF EXISTS mv_spend_by_naics;
+
+ALTER TABLE contracts RENAME TO contract_facts;
+
+ALTER TABLE contract_facts
+    ADD COLUMN department_agency_id SMALLINT REFERENCES dim_department_agency(id),
+    ADD COLUMN sub_tier_id SMALLINT REFERENCES dim_sub_tier(id),
+    ADD COLUMN office_id INTEGER REFERENCES dim_office(id),
+    ADD COLUMN fullparentpathname_id INTEGER REFERENCES dim_fullparentpathname(id),
+    ADD COLUMN organization_type_id SMALLINT REFERENCES dim_organization_type(id),
+    ADD COLUMN type_id SMALLINT REFERENCES dim_type(id);
+
+UPDATE contract_facts f SET
+    department_agency_id = (SELECT id FROM dim_department_agency d WHERE d.name = f.department_agency),
+    sub_tier_id = (SELECT id FROM dim_sub_tier d WHERE d.name = f.sub_tier),
+    office_id = (SELECT id FROM dim_office d WHERE d.name = f.office),
+    fullparentpathname_id = (SELECT id FROM dim_fullparentpathname d WHERE d.name = f.fullparentpathname),
+    organization_type_id = (SELECT id FROM dim_organization_type d WHERE d.name = f.organization_type),
+    type_id = (SELECT id FROM dim_type d WHERE d.name = f.type);
+
+-- Dropping the text columns also drops their B-tree indexes
+ALTER TABLE contract_facts
+    DROP COLUMN department_agency,
+    DROP COLUMN sub_tier,
+    DROP COLUMN office,
+    DROP COLUMN fullparentpathname,
+    DROP COLUMN organization_type,
+    DROP COLUMN type;
+
+CREATE INDEX idx_contract_facts_department_agency_id ON contract_facts(department_agency_id);
+CREATE INDEX idx_contract_facts_sub_tier_id ON contract_facts(sub_tier_id);
+CREATE INDEX idx_contract_facts_office_id ON contract_facts(office_id);
+CREATE INDEX idx_contract_facts_type_id ON contract_facts(type_id);
+
+-- DROP COLUMN only hides the old values; run VACUUM FULL contract_facts (outside a
+-- transaction) after this migration to reclaim the row width
+
+-- Compatibility view with the original column names
+CREATE VIEW contracts AS
+SELECT
+    f.*,
+    da.name AS department_agency,
+    st.name AS sub_tier,
+    o.name AS office,
+    pp.name AS fullparentpathname,
+    ot.name AS organization_type,
+    t.name AS type
+FROM contract_facts f
+LEFT JOIN dim_department_agency da ON da.id = f.department_agency_id
+LEFT JOIN dim_sub_tier st ON st.id = f.sub_tier_id
+LEFT JOIN dim_office o ON o.id = f.office_id
+LEFT JOIN dim_fullparentpathname pp ON pp.id = f.fullparentpathname_id
+LEFT JOIN dim_organization_type ot ON ot.id = f.organization_type_id
+LEFT JOIN dim_type t ON t.id = f.type_id;
+
+ALTER VIEW contracts ALTER COLUMN id SET DEFAULT nextval('contracts_id_seq');
+ALTER VIEW contracts ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;
+
+-- Resolve (or create) the key of a dimension value
+CREATE OR REPLACE FUNCTION dim_key(dim_table regclass, value TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+    key INTEGER;
+BEGIN
+    IF value IS NULL THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format('SELECT id FROM %s WHERE name = $1', dim_table) INTO key USING value;
+    IF key IS NULL THEN
+        EXECUTE format(
+            'INSERT INTO %s (name) VALUES ($1) ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name RETURNING id',
+            dim_table
+        ) INTO key USING value;
+    END IF;
+    RETURN key;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Plain INSERTs into the contracts view are routed to contract_facts. Bulk loaders
+-- should resolve keys themselves and write contract_facts directly (scripts/dimensions.py);
+-- ON CONFLICT upserts must target contract_facts.
+CREATE OR REPLACE FUNCTION contracts_view_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO contract_facts
+    SELECT * FROM jsonb_populate_record(NULL::contract_facts, to_jsonb(NEW) || jsonb_build_object(
+        'department_agency_id', dim_key('dim_department_agency', NEW.department_agency),
+        'sub_tier_id', dim_key('dim_sub_tier', NEW.sub_tier),
+        'office_id', dim_key('dim_office', NEW.office),
+        'fullparentpathname_id', dim_key('dim_fullparentpathname', NEW.fullparentpathname),
+        'organization_type_id', dim_key('dim_organization_type', NEW.organization_type),
+        'type_id', dim_key('dim_type', NEW.type)
+    ));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER contracts_view_insert
+INSTEAD OF INSERT ON contracts
+FOR EACH ROW EXECUTE FUNCTION contracts_view_insert();
+
+-- Recreate the analytics views over the compatibility view
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_spend_by_state AS
+SELECT
+    c.state,
+    s.name as state_name,
+    EXTRACT(YEAR FROM c.posted_date) as year,
+    COUNT(*) as contract_count,
+    SUM(c.award_amount) as total_amount,
+    AVG(c.award_amount) as avg_amount
+FROM contracts c
+LEFT JOIN states s ON c.state = s.code
+WHERE c.award_amount IS NOT NULL
+    AND c.award_amount > 0
+    AND c.state IS NOT NULL
+    AND c.posted_date IS NOT NULL
+GROUP BY c.state, s.name, EXTRACT(YEAR FROM c.posted_date);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_spend_by_agency AS
+SELECT
+    department_agency,
+    sub_tier,
+    EXTRACT(YEAR FROM posted_date) as year,
+    COUNT(*) as contract_count,
+    SUM(award_amount) as total_amount,
+    AVG(award_amount) as avg_amount
+FROM contracts
+WHERE award_amount IS NOT NULL
+    AND award_amount > 0
+    AND department_agency IS NOT NULL
+    AND posted_date IS NOT NULL
+GROUP BY department_agency, sub_tier, EXTRACT(YEAR FROM posted_date);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_spend_by_naics AS
+SELECT
+    c.naics_code,
+    n.title as naics_title,
+    EXTRACT(YEAR FROM c.posted_date) as year,
+    COUNT(*) as contract_count,
+    SUM(c.award_amount) as total_amount,
+    AVG(c.award_amount) as avg_amount
+FROM contracts c
+LEFT JOIN naics_codes n ON c.naics_code = n.code
+WHERE c.award_amount IS NOT NULL
+    AND c.award_amount > 0
+    AND c.naics_code IS NOT NULL
+    AND c.posted_date IS NOT NULL
+GROUP BY c.naics_code, n.title, EXTRACT(YEAR FROM c.posted_date);
+
+CREATE INDEX idx_mv_spend_by_state_state ON mv_spend_by_state(state);
+CREATE INDEX idx_mv_spend_by_agency_agency ON mv_spend_by_agency(department_agency);
+CREATE INDEX idx_mv_spend_by_naics_code ON mv_spend_by_naics(naics_code);
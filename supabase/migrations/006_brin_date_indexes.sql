@@ -0,0 +1,10 @@
+-- BRIN indexes for time-range scans on the date columns. The importers write
+-- rows in posted_date order and scripts/recluster_contracts.py re-sorts older
+-- data, so each block range covers a narrow span of dates and a year or month
+-- filter reads only the matching blocks. The B-tree on posted_date is kept for
+-- ORDER BY posted_date, which BRIN cannot serve.
+CREATE INDEX IF NOT EXISTS idx_contract_facts_posted_date_brin
+    ON contract_facts USING brin (posted_date) WITH (pages_per_range = 32, autosummarize = on);
+
+CREATE INDEX IF NOT EXISTS idx_contract_facts_response_deadline_brin
+    ON contract_facts USING brin (response_deadline) WITH (pages_per_range = 32, autosummarize = on);